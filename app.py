@@ -1,28 +1,65 @@
+# PERFIL_MEMORIA=1: RSS por import y por artefacto al arrancar, deltas por callback y /debug/memoria
+from perfil_memoria import perfil_memoria
+perfil_memoria.registrar_importaciones()
 import traceback
 import os
 import dash
-from dash import dcc, html, Input, Output, callback
+from dash import dcc, html, Input, Output, State, callback, no_update
 import pandas as pd
 import joblib
-import plotly.express as px
 import plotly.graph_objects as go
-import numpy as np
-from sklearn.preprocessing import StandardScaler
+# INFERENCIA=numpy sirve el paquete exportado por exportar_modelos.py sin importar sklearn
+INFERENCIA = os.environ.get("INFERENCIA", "sklearn")
+if INFERENCIA == "numpy":
+    from inferencia_numpy import SegmentacionRecargableNumpy, cargar_paquete
+from segmentacion_online import SegmentacionRecargable
+from cache_resultados import CacheResultados, version_modelos
+from ingesta_arrow import registrar_endpoints
+from figuras import PlantillaAtribuciones, PlantillaBarrasFelicidad, PlantillaDispersionSegmentos
+from explicaciones import explicar
+from enrutador_modelos import VARIABLES_ENRUTAMIENTO, RegistroScoring, crear_enrutador, resolver, version_enrutamiento
+from monitor_aire import leer_estado as leer_estado_monitor
+from reglas_asociacion import REGLA_GENERAL, TablaReglas
+from grupos_despliegue import registrar_limites
+from validacion import (ESQUEMA_CLASIFICACION, ESQUEMA_CLUSTERING, ESQUEMA_CLUSTERING_LOTES,
+                        ESQUEMA_REGRESION, funcion_cliente, validar_filas)
 
 # Inicializar la app
 app = dash.Dash(__name__)
 server = app.server
+# Límite de peticiones simultáneas por grupo de rutas (ver grupos_despliegue.py)
+registrar_limites(server)
 app.title = "Dashboard de Aprendizaje Automático"
 BASE = os.path.dirname(__file__)
 print("BASE:", BASE)
 print("Archivos en BASE:", os.listdir(BASE))
 print("🔄 Cargando modelos...")
 
+paquete_numpy = None
+if INFERENCIA == "numpy":
+    try:
+        with perfil_memoria.medir("artefacto", "ModelosInferencia"):
+            paquete_numpy = cargar_paquete(BASE)
+        print("✅ Paquete de inferencia NumPy cargado")
+    except Exception as e:
+        print("❌ Error cargando paquete NumPy, se usan los pickles", e)
+        traceback.print_exc()
+
+def cargar_modelo(nombre):
+    if paquete_numpy is not None:
+        if nombre in paquete_numpy:
+            return paquete_numpy[nombre]
+        # P. ej. una variante A/B o shadow configurada después de exportar el paquete
+        print(f"⚠️ {nombre} no está en el paquete NumPy: se carga el pickle (importa scikit-learn). "
+              "Exportarlo con exportar_modelos.py con MODELOS_AB_*/MODELOS_SHADOW_* definidas")
+    with perfil_memoria.medir("artefacto", nombre):
+        return joblib.load(os.path.join(BASE, nombre))
+
 # -----------------------
 # 🔹 Cargar modelos
 # -----------------------
 try:
-    modelo_regresion = joblib.load(os.path.join(BASE, "RegresionSa.pkl"))
+    modelo_regresion = cargar_modelo("RegresionSa.pkl")
     print("✅ Modelo de regresión cargado")
 except Exception as e:
     print("❌ Error cargando modelo de regresión", e)
@@ -30,7 +67,7 @@ except Exception as e:
     modelo_regresion = None
 
 try:
-    modelo_clasificacion = joblib.load(os.path.join(BASE, "ClasificacionDe.pkl"))
+    modelo_clasificacion = cargar_modelo("ClasificacionDe.pkl")
     print("✅ Modelo de clasificación cargado")
 except Exception as e:
     print("❌ Error cargando modelo de clasificación", e)
@@ -38,7 +75,7 @@ except Exception as e:
     modelo_clasificacion = None
 
 try:
-    modelo_agrupamiento = joblib.load(os.path.join(BASE, "AgrupamientoSa.pkl"))
+    modelo_agrupamiento = cargar_modelo("AgrupamientoSa.pkl")
     print("✅ Modelo de agrupamiento cargado")
 except Exception as e:
     print("❌ Error cargando modelo de agrupamiento", e)
@@ -46,8 +83,8 @@ except Exception as e:
     modelo_agrupamiento = None
 
 try:
-    label_encoders = joblib.load(os.path.join(BASE, "label_encoders.pkl"))
-    income_encoder = joblib.load(os.path.join(BASE, "income_encoder.pkl"))
+    label_encoders = cargar_modelo("label_encoders.pkl")
+    income_encoder = cargar_modelo("income_encoder.pkl")
     print("✅ Encoders cargados")
 except Exception as e:
     print("❌ Error cargando encoders", e)
@@ -55,11 +92,43 @@ except Exception as e:
     label_encoders = None
     income_encoder = None
 
-# Crear scaler para clustering (simulado)
-scaler_cluster = StandardScaler()
-# Datos de ejemplo para ajustar el scaler
-ejemplo_datos = np.array([[100, 5, 10], [500, 15, 25], [1000, 30, 50]])
-scaler_cluster.fit(ejemplo_datos)
+# A/B y shadow scoring: MODELOS_AB_REGRESION="nuevo.pkl:0.1", MODELOS_SHADOW_REGRESION="otro.pkl"
+# (y las equivalentes *_CLASIFICACION). Latencias y diferencias van a ShadowScoring.sqlite3
+if any(os.environ.get(v) for v in VARIABLES_ENRUTAMIENTO):
+    registro_scoring = RegistroScoring()
+    modelo_regresion = crear_enrutador("regresion", modelo_regresion, cargar_modelo,
+                                       "MODELOS_AB_REGRESION", "MODELOS_SHADOW_REGRESION", registro_scoring)
+    modelo_clasificacion = crear_enrutador("clasificacion", modelo_clasificacion, cargar_modelo,
+                                           "MODELOS_AB_CLASIFICACION", "MODELOS_SHADOW_CLASIFICACION", registro_scoring)
+
+# Segmentación online: se recarga sola cuando el entrenamiento incremental
+# deja un checkpoint nuevo en ARTIFACTS_DIR
+if paquete_numpy is not None:
+    # Sin sklearn: se recarga la exportación JSON de cada checkpoint (o la instantánea del paquete)
+    segmentacion_online = SegmentacionRecargableNumpy(respaldo=paquete_numpy.get("SegmentacionOnline.pkl"))
+else:
+    segmentacion_online = SegmentacionRecargable()
+segmentacion_online.actual()
+
+# Cache compartida entre workers para salidas costosas (CACHE_BACKEND=lru|disco|redis).
+# La versión cambia con los artefactos y con la configuración A/B y shadow
+version_enrutador = version_enrutamiento()
+cache_resultados = CacheResultados(
+    version=version_modelos() + (f"-{version_enrutador}" if version_enrutador else ""))
+
+# Endpoints de scoring por lotes con Arrow IPC / Parquet (/api/regresion, ...)
+registrar_endpoints(server, lambda: {
+    'regresion': modelo_regresion,
+    'clasificacion': modelo_clasificacion,
+    'label_encoders': label_encoders,
+    'income_encoder': income_encoder,
+    'segmentacion': segmentacion_online,
+})
+
+# Figuras base: se construyen una vez y los callbacks solo envían Patch
+plantilla_comparacion = PlantillaBarrasFelicidad()
+plantilla_clientes = PlantillaDispersionSegmentos()
+plantilla_atribuciones = PlantillaAtribuciones()
 
 # -----------------------
 # 🔹 LAYOUT DEL DASHBOARD
@@ -275,7 +344,9 @@ app.layout = html.Div([
                     ], style={'width': '32%', 'display': 'inline-block', 'verticalAlign': 'top', 'padding': '10px'})
                 ]),
                 
-                html.Div(id='comparison-result', style={'marginTop': '20px'})
+                html.Div(id='comparison-validacion', style={'color': '#c0392b', 'marginTop': '10px'}),
+                dcc.Graph(id='comparison-graph', figure=plantilla_comparacion.base(), style={'marginTop': '20px'}),
+                html.Div(id='comparison-result')
             ], style={'padding': '20px'})
         ]),
 
@@ -297,7 +368,8 @@ app.layout = html.Div([
                         
                         html.Label("Productos Comprados:", style={'fontWeight': 'bold'}),
                         dcc.Input(id='productos-input', type='number', value=20, min=1, max=200,
-                                style={'width': '100%', 'marginBottom': '20px'})
+                                style={'width': '100%', 'marginBottom': '20px'}),
+                        html.Div(id='clustering-individual-validacion', style={'color': '#c0392b'})
                     ], style={'width': '50%', 'display': 'inline-block'}),
                     
                     html.Div(id='clustering-individual-result', 
@@ -383,7 +455,9 @@ app.layout = html.Div([
                     ], style={'width': '24%', 'display': 'inline-block', 'verticalAlign': 'top', 'padding': '10px'})
                 ]),
                 
-                html.Div(id='clustering-multiple-result', style={'marginTop': '20px'})
+                html.Div(id='clustering-multiple-validacion', style={'color': '#c0392b', 'marginTop': '10px'}),
+                dcc.Graph(id='clustering-multiple-graph', figure=plantilla_clientes.base(), style={'marginTop': '20px'}),
+                html.Div(id='clustering-multiple-result')
             ], style={'padding': '20px'})
         ]),
 
@@ -493,8 +567,11 @@ app.layout = html.Div([
                     ], style={'width': '48%', 'float': 'right', 'display': 'inline-block'})
                 ]),
                 
+                html.Div(id='classification-validacion', style={'color': '#c0392b', 'marginTop': '10px'}),
                 html.Div(id='classification-result', style={'marginTop': '30px', 'fontSize': '18px',
-                        'textAlign': 'center', 'backgroundColor': '#fff3cd', 'padding': '20px', 'borderRadius': '10px'})
+                        'textAlign': 'center', 'backgroundColor': '#fff3cd', 'padding': '20px', 'borderRadius': '10px'}),
+                
+                dcc.Graph(id='classification-explanation', figure=plantilla_atribuciones.base(), style={'marginTop': '20px'})
             ], style={'padding': '20px'})
         ]),
 
@@ -558,7 +635,14 @@ app.layout = html.Div([
                     ], style={'width': '48%', 'float': 'right', 'display': 'inline-block'})
                 ]),
                 
-                html.Div(id='association-result', style={'marginTop': '30px'})
+                html.Div(id='association-result', style={'marginTop': '30px'}),
+                
+                # Monitor en tiempo real (lo alimenta monitor_aire.py en otro proceso)
+                html.Hr(),
+                html.H3("📡 Monitor en Tiempo Real", style={'color': '#f39c12'}),
+                dcc.Interval(id='monitor-interval', interval=2000),
+                dcc.Store(id='monitor-version'),
+                html.Div(id='monitor-result')
             ], style={'padding': '20px'})
         ])
     ])
@@ -581,6 +665,9 @@ app.layout = html.Div([
 def update_regression_individual(gdp, social, health, freedom, generosity, corruption):
     if modelo_regresion is None:
         return "❌ Modelo no disponible"
+    invalida = validar_filas(ESQUEMA_REGRESION, [[gdp, social, health, freedom, generosity, corruption]])
+    if invalida:
+        return invalida
     
     try:
         # Crear DataFrame con los datos ingresados
@@ -617,7 +704,8 @@ def update_regression_individual(gdp, social, health, freedom, generosity, corru
 
 # Callback para comparación de países
 @app.callback(
-    Output('comparison-result', 'children'),
+    [Output('comparison-graph', 'figure'),
+     Output('comparison-result', 'children')],
     [Input('pais1-nombre', 'value'), Input('pais1-gdp', 'value'), Input('pais1-social', 'value'),
      Input('pais1-health', 'value'), Input('pais1-freedom', 'value'), Input('pais1-generosity', 'value'),
      Input('pais1-corruption', 'value'), Input('pais2-nombre', 'value'), Input('pais2-gdp', 'value'),
@@ -626,9 +714,15 @@ def update_regression_individual(gdp, social, health, freedom, generosity, corru
      Input('pais3-gdp', 'value'), Input('pais3-social', 'value'), Input('pais3-health', 'value'),
      Input('pais3-freedom', 'value'), Input('pais3-generosity', 'value'), Input('pais3-corruption', 'value')]
 )
+@cache_resultados.memoizar('comparacion')
 def update_country_comparison(*args):
     if modelo_regresion is None:
-        return "❌ Modelo no disponible"
+        return no_update, "❌ Modelo no disponible"
+    # Se valida antes de armar el DataFrame: la entrada inválida no llega al modelo
+    invalida = validar_filas(ESQUEMA_REGRESION, [args[i * 7 + 1:i * 7 + 7] for i in range(3)],
+                             [args[i * 7] for i in range(3)])
+    if invalida:
+        return no_update, invalida
     
     try:
         # Organizar datos de los 3 países
@@ -652,18 +746,15 @@ def update_country_comparison(*args):
         predicciones = modelo_regresion.predict(df_paises.drop('País', axis=1))
         df_paises['Felicidad'] = predicciones
         
-        # Crear gráfico de comparación
-        fig = px.bar(df_paises, x='País', y='Felicidad', 
-                    title="Comparación de Índices de Felicidad",
-                    color='Felicidad', color_continuous_scale='viridis')
-        fig.update_layout(plot_bgcolor='white')
-        
         # Ranking
         df_ranking = df_paises.sort_values('Felicidad', ascending=False).reset_index(drop=True)
         df_ranking['Posición'] = range(1, len(df_ranking) + 1)
         
-        return html.Div([
-            dcc.Graph(figure=fig),
+        # Actualizar solo los datos del gráfico de comparación
+        fig = plantilla_comparacion.actualizar(df_paises['País'], df_paises['Felicidad'],
+                                               orden=df_ranking['País'])
+        
+        return fig, html.Div([
             html.H4("🏆 Ranking de Felicidad:"),
             html.Div([
                 html.P(f"{row['Posición']}. {row['País']}: {row['Felicidad']:.3f} puntos", 
@@ -673,11 +764,12 @@ def update_country_comparison(*args):
         ])
         
     except Exception as e:
-        return f"❌ Error en comparación: {str(e)}"
+        return no_update, f"❌ Error en comparación: {str(e)}"
 
 # Callback para clasificación
 @app.callback(
-    Output('classification-result', 'children'),
+    [Output('classification-result', 'children'),
+     Output('classification-explanation', 'figure')],
     [Input('edad-input', 'value'), Input('workclass-dropdown', 'value'),
      Input('education-dropdown', 'value'), Input('marital-dropdown', 'value'),
      Input('occupation-dropdown', 'value'), Input('sex-dropdown', 'value'),
@@ -685,7 +777,11 @@ def update_country_comparison(*args):
 )
 def update_classification(edad, workclass, education, marital, occupation, sex, hours, country):
     if modelo_clasificacion is None or label_encoders is None or income_encoder is None:
-        return "❌ Modelo no disponible"
+        return "❌ Modelo no disponible", no_update
+    invalida = validar_filas(ESQUEMA_CLASIFICACION,
+                             [[edad, workclass, education, marital, occupation, sex, hours, country]])
+    if invalida:
+        return invalida, no_update
     
     try:
         # Crear DataFrame con datos completos (incluyendo valores por defecto)
@@ -716,12 +812,17 @@ def update_classification(edad, workclass, education, marital, occupation, sex,
                     # Si el valor no existe en el encoder, usar 0
                     X_encoded[col] = 0
         
-        # Predicción
-        y_pred = modelo_clasificacion.predict(X_encoded)
-        y_pred_proba = modelo_clasificacion.predict_proba(X_encoded)
+        # Predicción: la variante A/B se elige una vez y se usa también para la explicación
+        servido = resolver(modelo_clasificacion, X_encoded)
+        y_pred = servido.predict(X_encoded)
+        y_pred_proba = servido.predict_proba(X_encoded)
         resultado = income_encoder.inverse_transform(y_pred)[0]
         confianza = y_pred_proba[0].max()
         
+        # Contribución de cada variable (una sola llamada a predict_proba)
+        df_atribuciones, unidad = explicar(servido.modelo, X_encoded, label_encoders)
+        fig = plantilla_atribuciones.actualizar(df_atribuciones, unidad)
+        
         # Interpretar resultado
         color = "#27ae60" if resultado == ">50K" else "#e74c3c"
         emoji = "💰" if resultado == ">50K" else "💼"
@@ -731,10 +832,10 @@ def update_classification(edad, workclass, education, marital, occupation, sex,
             html.P(f"🎯 Confianza del modelo: {confianza:.1%}", style={'fontSize': '16px'}),
             html.P(f"📊 Probabilidad >50K: {y_pred_proba[0][1]:.1%}", style={'fontSize': '14px'}),
             html.P(f"📊 Probabilidad ≤50K: {y_pred_proba[0][0]:.1%}", style={'fontSize': '14px'})
-        ])
+        ]), fig
         
     except Exception as e:
-        return f"❌ Error en clasificación: {str(e)}"
+        return f"❌ Error en clasificación: {str(e)}", no_update
 
 # Callback para clustering individual
 @app.callback(
@@ -744,15 +845,24 @@ def update_classification(edad, workclass, education, marital, occupation, sex,
      Input('productos-input', 'value')]
 )
 def update_clustering_individual(gasto, transacciones, productos):
+    invalida = validar_filas(ESQUEMA_CLUSTERING, [[gasto, transacciones, productos]])
+    if invalida:
+        return invalida
     try:
-        # Determinar cluster basado en reglas simples
-        if gasto < 250:
+        # Determinar cluster: modelo online si ya hay checkpoint, si no reglas simples
+        modelo_online = segmentacion_online.actual()
+        if modelo_online is not None:
+            segmento = modelo_online.predecir([[gasto, transacciones, productos]])[0]
+        else:
+            segmento = "Básico" if gasto < 250 else "Regular" if gasto < 600 else "Premium"
+
+        if segmento == "Básico":
             cluster = 0
             label = "Básico"
             color = "#e74c3c"
             emoji = "🔵"
             descripcion = "Cliente con gastos moderados y poca frecuencia de compra"
-        elif gasto < 600:
+        elif segmento == "Regular":
             cluster = 1
             label = "Regular"
             color = "#f39c12"
@@ -784,7 +894,8 @@ def update_clustering_individual(gasto, transacciones, productos):
 
 # Callback para clustering múltiple
 @app.callback(
-    Output('clustering-multiple-result', 'children'),
+    [Output('clustering-multiple-graph', 'figure'),
+     Output('clustering-multiple-result', 'children')],
     [Input('cliente1-nombre', 'value'), Input('cliente1-gasto', 'value'),
      Input('cliente1-trans', 'value'), Input('cliente1-prod', 'value'),
      Input('cliente2-nombre', 'value'), Input('cliente2-gasto', 'value'),
@@ -795,6 +906,10 @@ def update_clustering_individual(gasto, transacciones, productos):
      Input('cliente4-trans', 'value'), Input('cliente4-prod', 'value')]
 )
 def update_clustering_multiple(*args):
+    invalida = validar_filas(ESQUEMA_CLUSTERING_LOTES, [args[i * 4 + 1:i * 4 + 4] for i in range(4)],
+                             [args[i * 4] for i in range(4)])
+    if invalida:
+        return no_update, invalida
     try:
         # Organizar datos de los 4 clientes
         clientes_data = []
@@ -823,15 +938,14 @@ def update_clustering_multiple(*args):
             else:
                 return "Premium"
         
-        df_clientes['Segmento'] = df_clientes['Gasto'].apply(asignar_cluster)
+        modelo_online = segmentacion_online.actual()
+        if modelo_online is not None:
+            df_clientes['Segmento'] = modelo_online.predecir(df_clientes)
+        else:
+            df_clientes['Segmento'] = df_clientes['Gasto'].apply(asignar_cluster)
         
-        # Crear gráfico
-        fig = px.scatter(df_clientes, x='Gasto', y='Transacciones', 
-                        size='Productos', color='Segmento',
-                        hover_data=['Cliente'],
-                        title="Comparación de Clientes por Segmento",
-                        color_discrete_map={'Básico': '#e74c3c', 'Regular': '#f39c12', 'Premium': '#27ae60'})
-        fig.update_layout(plot_bgcolor='white')
+        # Actualizar solo los datos del gráfico
+        fig = plantilla_clientes.actualizar(df_clientes)
         
         # Crear tabla resumen
         resumen = df_clientes.groupby('Segmento').agg({
@@ -842,14 +956,71 @@ def update_clustering_multiple(*args):
         }).round(2)
         resumen.columns = ['Gasto Promedio', 'Transacciones Promedio', 'Productos Promedio', 'Cantidad']
         
-        return html.Div([
-            dcc.Graph(figure=fig),
+        return fig, html.Div([
             html.H4("📊 Resumen por Segmento:"),
             html.Pre(resumen.to_string(), style={'backgroundColor': '#f8f9fa', 'padding': '15px'})
         ])
         
     except Exception as e:
-        return f"❌ Error: {str(e)}"
+        return no_update, f"❌ Error: {str(e)}"
+
+# Validación en el navegador: mismo esquema que los callbacks, sin ir al servidor
+CAMPOS_REGRESION = ['gdp', 'social', 'health', 'freedom', 'generosity', 'corruption']
+app.clientside_callback(
+    funcion_cliente(ESQUEMA_REGRESION, list(ESQUEMA_REGRESION), ['País A', 'País B', 'País C'], con_nombre=True),
+    Output('comparison-validacion', 'children'),
+    [Input(f'pais{i}-{campo}', 'value') for i in range(1, 4) for campo in ['nombre'] + CAMPOS_REGRESION]
+)
+app.clientside_callback(
+    funcion_cliente(ESQUEMA_CLUSTERING, list(ESQUEMA_CLUSTERING)),
+    Output('clustering-individual-validacion', 'children'),
+    [Input('gasto-input', 'value'), Input('transacciones-input', 'value'), Input('productos-input', 'value')]
+)
+app.clientside_callback(
+    funcion_cliente(ESQUEMA_CLUSTERING_LOTES, list(ESQUEMA_CLUSTERING_LOTES), [f'Cliente {c}' for c in 'ABCD'],
+                    con_nombre=True),
+    Output('clustering-multiple-validacion', 'children'),
+    [Input(f'cliente{i}-{campo}', 'value') for i in range(1, 5) for campo in ['nombre', 'gasto', 'trans', 'prod']]
+)
+app.clientside_callback(
+    funcion_cliente(ESQUEMA_CLASIFICACION, ['age', 'hours-per-week']),
+    Output('classification-validacion', 'children'),
+    [Input('edad-input', 'value'), Input('hours-input', 'value')]
+)
+
+# Respuesta de la pestaña de reglas para unas condiciones dadas
+def renderizar_reglas(condiciones, reglas_aplicables):
+    # Si no hay reglas aplicables, mostrar algunas reglas generales
+    if not reglas_aplicables:
+        reglas_aplicables = [REGLA_GENERAL]
+    
+    # Crear visualización
+    resultado = html.Div([
+        html.H3("🔍 Reglas de Asociación Encontradas:", style={'color': '#f39c12'}),
+        html.P(f"📊 Condiciones actuales: {', '.join(condiciones)}", 
+              style={'backgroundColor': '#f8f9fa', 'padding': '10px', 'borderRadius': '5px'}),
+        html.Hr()
+    ])
+    
+    for regla in reglas_aplicables:
+        color = "#27ae60" if regla['aplicable'] else "#95a5a6"
+        icono = "✅" if regla['aplicable'] else "ℹ️"
+        
+        resultado.children.append(
+            html.Div([
+                html.H4(f"{icono} {regla['regla']}", style={'color': color}),
+                html.P(f"🎯 Confianza: {regla['confianza']:.1%}"),
+                html.P(f"📈 Lift: {regla['lift']:.1f}"),
+                html.P(f"💡 {regla['descripcion']}", style={'fontStyle': 'italic'}),
+                html.Hr()
+            ], style={'backgroundColor': '#fff3cd' if regla['aplicable'] else '#f8f9fa', 
+                     'padding': '15px', 'borderRadius': '10px', 'marginBottom': '10px'})
+        )
+    
+    return resultado
+
+# Las 3^6 combinaciones de dropdowns se precalculan al cargar las reglas
+tabla_reglas = TablaReglas(renderizar_reglas)
 
 # Callback para reglas de asociación
 @app.callback(
@@ -860,65 +1031,55 @@ def update_clustering_multiple(*args):
 )
 def update_association_rules(co, nox, no2, temp, humedad, benceno):
     try:
-        # Simular base de reglas de asociación
-        reglas_conocidas = {
-            ('co_alto', 'nox_alto'): {'confianza': 0.85, 'lift': 2.3, 'descripcion': 'CO alto está fuertemente asociado con NOx alto'},
-            ('temp_alto', 'humedad_bajo'): {'confianza': 0.75, 'lift': 1.8, 'descripcion': 'Temperatura alta tiende a correlacionarse con baja humedad'},
-            ('nox_alto', 'no2_alto'): {'confianza': 0.88, 'lift': 2.5, 'descripcion': 'NOx alto predice fuertemente NO2 alto'},
-            ('benceno_alto', 'co_alto'): {'confianza': 0.70, 'lift': 1.9, 'descripcion': 'Benceno alto se asocia con CO alto'},
-            ('humedad_alto', 'temp_bajo'): {'confianza': 0.82, 'lift': 1.7, 'descripcion': 'Alta humedad se asocia con temperatura baja'}
-        }
-        
-        # Condiciones actuales
-        condiciones = [f'co_{co}', f'nox_{nox}', f'no2_{no2}', f'temp_{temp}', f'humedad_{humedad}', f'benceno_{benceno}']
-        
-        # Buscar reglas aplicables
-        reglas_aplicables = []
-        
-        for (antecedente, consecuente), info in reglas_conocidas.items():
-            if antecedente in condiciones:
-                reglas_aplicables.append({
-                    'regla': f'{antecedente} → {consecuente}',
-                    'confianza': info['confianza'],
-                    'lift': info['lift'],
-                    'descripcion': info['descripcion'],
-                    'aplicable': True
-                })
-        
-        # Si no hay reglas aplicables, mostrar algunas reglas generales
-        if not reglas_aplicables:
-            reglas_aplicables = [
-                {'regla': 'co_medio → nox_medio', 'confianza': 0.65, 'lift': 1.4, 
-                 'descripcion': 'Condiciones moderadas de CO tienden a asociarse con NOx moderado', 'aplicable': False}
-            ]
-        
-        # Crear visualización
-        resultado = html.Div([
-            html.H3("🔍 Reglas de Asociación Encontradas:", style={'color': '#f39c12'}),
-            html.P(f"📊 Condiciones actuales: {', '.join(condiciones)}", 
-                  style={'backgroundColor': '#f8f9fa', 'padding': '10px', 'borderRadius': '5px'}),
-            html.Hr()
-        ])
+        return tabla_reglas.obtener([co, nox, no2, temp, humedad, benceno])
         
-        for regla in reglas_aplicables:
-            color = "#27ae60" if regla['aplicable'] else "#95a5a6"
-            icono = "✅" if regla['aplicable'] else "ℹ️"
-            
-            resultado.children.append(
-                html.Div([
-                    html.H4(f"{icono} {regla['regla']}", style={'color': color}),
-                    html.P(f"🎯 Confianza: {regla['confianza']:.1%}"),
-                    html.P(f"📈 Lift: {regla['lift']:.1f}"),
-                    html.P(f"💡 {regla['descripcion']}", style={'fontStyle': 'italic'}),
-                    html.Hr()
-                ], style={'backgroundColor': '#fff3cd' if regla['aplicable'] else '#f8f9fa', 
-                         'padding': '15px', 'borderRadius': '10px', 'marginBottom': '10px'})
-            )
+    except Exception as e:
+        return f"❌ Error: {str(e)}"
+
+# Callback para el monitor de calidad del aire
+@app.callback(
+    [Output('monitor-result', 'children'),
+     Output('monitor-version', 'data')],
+    [Input('monitor-interval', 'n_intervals')],
+    [State('monitor-version', 'data')]
+)
+def update_monitor_aire(n_intervals, version):
+    estado = leer_estado_monitor()
+    if estado is None:
+        if version == 'inactivo':
+            return no_update, no_update
+        return html.P("ℹ️ Monitor inactivo. Inícialo con: python monitor_aire.py replay <lecturas.csv>",
+                      style={'color': '#7f8c8d'}), 'inactivo'
+    
+    # Solo se reconstruye el panel cuando el monitor publica un estado nuevo
+    if estado['actualizado'] == version:
+        return no_update, no_update
+    
+    try:
+        alertas = [
+            html.Div([
+                html.H4(f"🚨 {alerta['regla']}", style={'color': '#e74c3c', 'margin': '0'}),
+                html.P(f"🕒 {alerta['momento']} · 🎯 Confianza: {alerta['confianza']:.1%} · 📈 Lift: {alerta['lift']:.1f}",
+                       style={'margin': '5px 0'}),
+                html.P(f"💡 {alerta['descripcion']}", style={'fontStyle': 'italic', 'margin': '0'})
+            ], style={'backgroundColor': '#fdecea', 'padding': '10px', 'borderRadius': '10px', 'marginBottom': '8px'})
+            for alerta in estado['alertas'][:10]
+        ]
         
-        return resultado
+        return html.Div([
+            html.P(f"📊 Condiciones actuales: {', '.join(estado['condiciones'])}",
+                   style={'backgroundColor': '#f8f9fa', 'padding': '10px', 'borderRadius': '5px'}),
+            html.P(f"📈 {estado['lecturas']} lecturas procesadas ({estado['lecturas_por_segundo']:.0f} lecturas/s)"),
+            html.Div(alertas or [html.P("✅ Sin alertas recientes")])
+        ]), estado['actualizado']
         
     except Exception as e:
-        return f"❌ Error: {str(e)}"
+        return f"❌ Error: {str(e)}", no_update
+
+# Perfil de memoria (solo con PERFIL_MEMORIA=1)
+perfil_memoria.instrumentar_callbacks(app)
+perfil_memoria.registrar_endpoint(server)
+perfil_memoria.reporte_inicio()
 
 if __name__ == "__main__":
     import os
@@ -0,0 +1,181 @@
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+from grupos_despliegue import GRUPOS
+from validacion import ESQUEMA_REGRESION
+
+# -----------------------
+# 🔹 Peticiones de cada grupo
+# -----------------------
+# Objetivos de latencia p95 (ms) para las rutas sensibles bajo carga mixta
+SLO_P95_MS = {'interactivo': 250, 'estatico': 150}
+
+# Mismo orden que ESQUEMA_REGRESION
+CAMPOS_PAIS = ['gdp', 'social', 'health', 'freedom', 'generosity', 'corruption']
+
+
+def _valores_regresion():
+    # Dentro del rango de cada campo: una entrada inválida no llega al modelo
+    return [random.uniform(c['min'], c['max']) for c in ESQUEMA_REGRESION.values()]
+
+
+def _callback(salidas, entradas):
+    # Mismo cuerpo que envía el renderer de Dash a /_dash-update-component
+    ids = [s.split('.') for s in salidas]
+    return {
+        'output': salidas[0] if len(salidas) == 1 else '..' + '...'.join(salidas) + '..',
+        'outputs': ({'id': ids[0][0], 'property': ids[0][1]} if len(ids) == 1
+                    else [{'id': i, 'property': p} for i, p in ids]),
+        'inputs': [{'id': i, 'property': 'value', 'value': v} for i, v in entradas],
+        'changedPropIds': [f'{entradas[0][0]}.value'],
+        'state': [],
+    }
+
+
+def payload_slider():
+    ids = [f'{c}-slider' for c in CAMPOS_PAIS]
+    return _callback(['regression-result.children'], list(zip(ids, _valores_regresion())))
+
+
+def payload_comparacion():
+    # Valores aleatorios para no acertar siempre en la cache de resultados
+    entradas = []
+    for i in range(1, 4):
+        entradas.append((f'pais{i}-nombre', f'País {i}'))
+        entradas += [(f'pais{i}-{c}', round(v, 3)) for c, v in zip(CAMPOS_PAIS, _valores_regresion())]
+    return _callback(['comparison-graph.figure', 'comparison-result.children'], entradas)
+
+
+def cuerpo_lote(filas):
+    import pyarrow as pa
+    from ingesta_arrow import escribir_tabla
+    rng = np.random.default_rng(0)
+    tabla = pa.table({
+        'Gasto': rng.uniform(1, 5000, filas),
+        'Transacciones': rng.uniform(1, 100, filas),
+        'Productos': rng.uniform(1, 200, filas),
+    })
+    return escribir_tabla(tabla).to_pybytes()
+
+
+def _url(args, grupo):
+    # --directo: cada grupo en su puerto de gunicorn, sin pasar por nginx
+    return f"http://127.0.0.1:{GRUPOS[grupo]['puerto']}" if args.directo else args.url
+
+
+def peticiones(args):
+    lote = cuerpo_lote(args.filas_lote)
+    json_post = {'Content-Type': 'application/json'}
+    return {
+        'interactivo': lambda: (f"{_url(args, 'interactivo')}/_dash-update-component",
+                                json.dumps(payload_slider()).encode(), json_post),
+        'pesado': lambda: (f"{_url(args, 'interactivo')}/_dash-update-component",
+                           json.dumps(payload_comparacion()).encode(), json_post),
+        'lotes': lambda: (f"{_url(args, 'lotes')}/api/clustering", lote,
+                          {'Content-Type': 'application/vnd.apache.arrow.stream'}),
+        'estatico': lambda: (f"{_url(args, 'estatico')}/_dash-layout", None, {}),
+    }
+
+
+# -----------------------
+# 🔹 Generación de carga
+# -----------------------
+def _enviar(url, cuerpo, encabezados, timeout):
+    inicio = time.perf_counter()
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=cuerpo, headers=encabezados),
+                                    timeout=timeout) as r:
+            r.read()
+            estado = r.status
+    except urllib.error.HTTPError as e:
+        estado = e.code
+    except Exception:
+        estado = 0
+    return (time.perf_counter() - inicio) * 1000, estado
+
+
+def cargar(fabricas, grupos, clientes, duracion, timeout=60):
+    # clientes: {grupo: hilos}; cada hilo envía peticiones en bucle cerrado
+    resultados = {g: [] for g in grupos}
+    fin = time.time() + duracion
+
+    def cliente(grupo):
+        while time.time() < fin:
+            resultados[grupo].append(_enviar(*fabricas[grupo](), timeout))
+
+    hilos = [threading.Thread(target=cliente, args=(g,)) for g in grupos for _ in range(clientes[g])]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    return resultados
+
+
+def resumir(muestras, duracion):
+    if not muestras:
+        return {'n': 0}
+    latencias = np.array([m for m, e in muestras if e == 200])
+    estados = [e for _, e in muestras]
+    resumen = {
+        'n': len(muestras),
+        'rps': round(len(muestras) / duracion, 1),
+        'rechazadas_503': estados.count(503),
+        'errores': sum(e not in (200, 503) for e in estados),
+    }
+    if len(latencias):
+        for q in (50, 95, 99):
+            resumen[f'p{q}_ms'] = round(float(np.percentile(latencias, q)), 1)
+    return resumen
+
+
+def _imprimir(fase, resumenes):
+    print(f"\n📊 {fase}")
+    for grupo, r in resumenes.items():
+        detalle = ", ".join(f"{k}={v}" for k, v in r.items())
+        print(f"   {grupo:<12} {detalle}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latencia por grupo de rutas, aislado y con carga mixta")
+    parser.add_argument("--url", default="http://127.0.0.1:10000", help="nginx (o gunicorn de un solo pool)")
+    parser.add_argument("--directo", action="store_true", help="usar los puertos de cada pool sin nginx")
+    parser.add_argument("--duracion", type=float, default=10.0, help="segundos por fase")
+    parser.add_argument("--filas-lote", type=int, default=200000)
+    parser.add_argument("--clientes-interactivo", type=int, default=4)
+    parser.add_argument("--clientes-pesado", type=int, default=4)
+    parser.add_argument("--clientes-lotes", type=int, default=4)
+    parser.add_argument("--clientes-estatico", type=int, default=2)
+    args = parser.parse_args()
+
+    fabricas = peticiones(args)
+    clientes = {g: getattr(args, f"clientes_{g}") for g in fabricas}
+
+    # Cada grupo por separado
+    aislado = {}
+    for grupo in fabricas:
+        aislado[grupo] = resumir(cargar(fabricas, [grupo], clientes, args.duracion)[grupo], args.duracion)
+    _imprimir("Cada grupo por separado", aislado)
+
+    # Todos a la vez: los lotes y las comparaciones no deben mover el p95 de sliders y layout
+    mixto = cargar(fabricas, list(fabricas), clientes, args.duracion)
+    mixto = {g: resumir(m, args.duracion) for g, m in mixto.items()}
+    _imprimir("Carga mixta", mixto)
+
+    fallos = []
+    for grupo, slo in SLO_P95_MS.items():
+        p95 = mixto[grupo].get('p95_ms')
+        rechazos = mixto[grupo]['errores'] + mixto[grupo]['rechazadas_503']
+        if p95 is None or p95 > slo or rechazos:
+            fallos.append(f"{grupo}: p95={p95} ms (SLO {slo} ms), errores/503={rechazos}")
+    if fallos:
+        print("\n❌ SLO no cumplido — " + "; ".join(fallos))
+        sys.exit(1)
+    print("\n✅ SLO cumplido para " + ", ".join(SLO_P95_MS))
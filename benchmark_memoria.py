@@ -0,0 +1,75 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from perfil_memoria import rss_mb
+
+# -----------------------
+# 🔹 Presupuesto por worker
+# -----------------------
+# RSS máximo (MB) de un worker en régimen estable y crecimiento tolerado
+# entre el final del calentamiento y el final de la carga (fugas).
+PRESUPUESTO_MB = float(os.environ.get("RSS_PRESUPUESTO_MB", 400))
+CRECIMIENTO_MB = float(os.environ.get("RSS_CRECIMIENTO_MB", 25))
+
+
+def ronda(cliente, payloads, lote):
+    # Una petición de cada tipo, como las que recibe un worker mezclado
+    for payload in payloads:
+        r = cliente.post("/_dash-update-component", data=json.dumps(payload()), content_type="application/json")
+        if r.status_code not in (200, 204):
+            raise RuntimeError(f"Callback {payload.__name__}: HTTP {r.status_code}")
+    r = cliente.post("/api/clustering", data=lote, content_type="application/vnd.apache.arrow.stream")
+    if r.status_code != 200:
+        raise RuntimeError(f"/api/clustering: HTTP {r.status_code}")
+    cliente.get("/_dash-layout")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RSS de un worker en régimen estable frente a un presupuesto")
+    parser.add_argument("--presupuesto-mb", type=float, default=PRESUPUESTO_MB)
+    parser.add_argument("--crecimiento-mb", type=float, default=CRECIMIENTO_MB)
+    parser.add_argument("--calentamiento", type=int, default=50, help="rondas antes de medir")
+    parser.add_argument("--rondas", type=int, default=300)
+    parser.add_argument("--filas-lote", type=int, default=50000)
+    args = parser.parse_args()
+
+    # Este proceso hace de worker: importa la app igual que gunicorn
+    rss_vacio = rss_mb()
+    inicio = time.perf_counter()
+    import app
+    from benchmark_grupos import cuerpo_lote, payload_comparacion, payload_slider
+    rss_arranque = rss_mb()
+    print(f"📏 Arranque: {rss_arranque:.1f} MB ({rss_arranque - rss_vacio:.1f} MB de la app, "
+          f"{time.perf_counter() - inicio:.1f} s)")
+
+    cliente = app.server.test_client()
+    payloads = [payload_slider, payload_comparacion]
+    lote = cuerpo_lote(args.filas_lote)
+
+    for _ in range(args.calentamiento):
+        ronda(cliente, payloads, lote)
+    rss_calentado = rss_mb()
+    print(f"📏 Tras {args.calentamiento} rondas de calentamiento: {rss_calentado:.1f} MB")
+
+    muestras = []
+    for i in range(args.rondas):
+        ronda(cliente, payloads, lote)
+        if i % 10 == 9:
+            muestras.append(rss_mb())
+    rss_final = rss_mb()
+    crecimiento = rss_final - rss_calentado
+    print(f"📏 Tras {args.rondas} rondas: {rss_final:.1f} MB (máx {max(muestras, default=rss_final):.1f} MB, "
+          f"crecimiento {crecimiento:+.1f} MB)")
+
+    fallos = []
+    if max(muestras + [rss_final]) > args.presupuesto_mb:
+        fallos.append(f"RSS {max(muestras + [rss_final]):.1f} MB supera el presupuesto de {args.presupuesto_mb:.0f} MB")
+    if crecimiento > args.crecimiento_mb:
+        fallos.append(f"crecimiento de {crecimiento:.1f} MB en régimen estable (límite {args.crecimiento_mb:.0f} MB)")
+    if fallos:
+        print("❌ " + "; ".join(fallos))
+        sys.exit(1)
+    print(f"✅ Dentro del presupuesto: {rss_final:.1f} / {args.presupuesto_mb:.0f} MB")
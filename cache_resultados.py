@@ -0,0 +1,257 @@
+import functools
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# -----------------------
+# 🔹 Configuración
+# -----------------------
+BASE = os.path.dirname(os.path.abspath(__file__))
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "disco")  # lru | disco | redis
+CACHE_DIR = os.environ.get("CACHE_DIR", os.path.join(BASE, ".cache_resultados"))
+CACHE_URL = os.environ.get("CACHE_URL", "redis://localhost:6379/0")
+CACHE_TTL = int(os.environ.get("CACHE_TTL", 3600))
+CACHE_MAX_ENTRADAS = int(os.environ.get("CACHE_MAX_ENTRADAS", 1024))
+CACHE_PURGAR_CADA = int(os.environ.get("CACHE_PURGAR_CADA", 64))  # escrituras entre purgas (SQLite)
+
+ARTEFACTOS_MODELO = ["RegresionSa.pkl", "ClasificacionDe.pkl", "AgrupamientoSa.pkl",
+                     "label_encoders.pkl", "income_encoder.pkl",
+                     "ModelosInferencia.npz", "ModelosInferencia.json"]
+
+
+def version_modelos(base=BASE, archivos=ARTEFACTOS_MODELO):
+    # Hash del contenido de los artefactos: si cambia un pickle, cambian las claves
+    h = hashlib.sha256()
+    for nombre in archivos:
+        ruta = os.path.join(base, nombre)
+        if os.path.exists(ruta):
+            h.update(nombre.encode())
+            with open(ruta, "rb") as f:
+                h.update(f.read())
+    return h.hexdigest()[:12]
+
+
+# -----------------------
+# 🔹 Backends (misma interfaz: get / set / limpiar)
+# -----------------------
+class CacheLRU:
+    """Cache en memoria del proceso; no se comparte entre workers."""
+
+    def __init__(self, max_entradas=CACHE_MAX_ENTRADAS, ttl=CACHE_TTL):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            expira, valor = entrada
+            if expira < time.time():
+                del self._datos[clave]
+                return None
+            self._datos.move_to_end(clave)
+            return valor
+
+    def set(self, clave, valor):
+        with self._lock:
+            self._datos[clave] = (time.time() + self.ttl, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+
+class CacheSQLite:
+    """Cache en disco compartida por todos los workers de la máquina.
+
+    Cada `purgar_cada` escrituras se borran las entradas vencidas y, si aún
+    sobran, las más antiguas hasta quedar en `max_entradas`.
+    """
+
+    def __init__(self, directorio=CACHE_DIR, ttl=CACHE_TTL, max_entradas=CACHE_MAX_ENTRADAS,
+                 purgar_cada=CACHE_PURGAR_CADA):
+        os.makedirs(directorio, exist_ok=True)
+        self.ruta = os.path.join(directorio, "cache.sqlite3")
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.purgar_cada = max(purgar_cada, 1)
+        self._escrituras = 0
+        self._local = threading.local()
+        with self._conexion() as con:
+            con.execute("CREATE TABLE IF NOT EXISTS cache (clave TEXT PRIMARY KEY, expira REAL, valor BLOB)")
+            con.execute("CREATE INDEX IF NOT EXISTS cache_expira ON cache (expira)")
+        self.purgar()
+
+    def _conexion(self):
+        # sqlite3 no permite compartir conexiones entre hilos
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.ruta, timeout=5, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            self._local.con = con
+        return con
+
+    def get(self, clave):
+        fila = self._conexion().execute(
+            "SELECT valor FROM cache WHERE clave = ? AND expira >= ?", (clave, time.time())
+        ).fetchone()
+        return fila[0] if fila else None
+
+    def set(self, clave, valor):
+        self._conexion().execute(
+            "INSERT OR REPLACE INTO cache (clave, expira, valor) VALUES (?, ?, ?)",
+            (clave, time.time() + self.ttl, sqlite3.Binary(valor)),
+        )
+        self._escrituras += 1
+        if self._escrituras % self.purgar_cada == 0:
+            self.purgar()
+
+    def purgar(self):
+        con = self._conexion()
+        con.execute("DELETE FROM cache WHERE expira < ?", (time.time(),))
+        # Todas las entradas tienen el mismo TTL: menor `expira` = escrita hace más tiempo
+        con.execute(
+            "DELETE FROM cache WHERE clave IN (SELECT clave FROM cache ORDER BY expira DESC LIMIT -1 OFFSET ?)",
+            (self.max_entradas,),
+        )
+
+    def limpiar(self):
+        self._conexion().execute("DELETE FROM cache")
+
+
+class CacheDisco:
+    """diskcache si está instalado; si no, SQLite de la librería estándar."""
+
+    def __init__(self, directorio=CACHE_DIR, ttl=CACHE_TTL):
+        self.ttl = ttl
+        if diskcache is not None:
+            self._cache = diskcache.Cache(directorio)
+        else:
+            self._cache = CacheSQLite(directorio, ttl)
+
+    def get(self, clave):
+        return self._cache.get(clave)
+
+    def set(self, clave, valor):
+        if diskcache is not None:
+            self._cache.set(clave, valor, expire=self.ttl)
+        else:
+            self._cache.set(clave, valor)
+
+    def limpiar(self):
+        if diskcache is not None:
+            self._cache.clear()
+        else:
+            self._cache.limpiar()
+
+
+class CacheRedis:
+    """Redis (p. ej. una instancia local) compartido por todos los workers."""
+
+    def __init__(self, url=CACHE_URL, ttl=CACHE_TTL, prefijo="dashml:"):
+        if redis is None:
+            raise ImportError("El backend 'redis' requiere el paquete redis")
+        self._cliente = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefijo = prefijo
+
+    def get(self, clave):
+        return self._cliente.get(self.prefijo + clave)
+
+    def set(self, clave, valor):
+        self._cliente.set(self.prefijo + clave, valor, ex=self.ttl)
+
+    def limpiar(self):
+        for clave in self._cliente.scan_iter(self.prefijo + "*"):
+            self._cliente.delete(clave)
+
+
+BACKENDS = {"lru": CacheLRU, "disco": CacheDisco, "redis": CacheRedis}
+
+
+def crear_cache(backend=CACHE_BACKEND):
+    try:
+        cache = BACKENDS[backend]()
+        print(f"✅ Cache de resultados: {backend}")
+        return cache
+    except Exception as e:
+        print(f"❌ Error iniciando cache '{backend}', se usa LRU en memoria", e)
+        return CacheLRU()
+
+
+# -----------------------
+# 🔹 Cache de callbacks
+# -----------------------
+def es_error(resultado):
+    # Los callbacks con figura devuelven (figura, mensaje): se revisan todas las salidas
+    salidas = resultado if isinstance(resultado, tuple) else (resultado,)
+    return any(isinstance(r, str) and r.startswith("❌") for r in salidas)
+
+
+class CacheResultados:
+    """Guarda salidas serializadas de callbacks con claves por contenido.
+
+    La clave incluye el nombre del callback, la versión de los modelos y
+    los argumentos, así que dos workers con la misma entrada comparten la
+    misma entrada de cache.
+    """
+
+    def __init__(self, backend=None, version=None):
+        self.backend = backend if backend is not None else crear_cache()
+        self.version = version or version_modelos()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def clave(self, nombre, args):
+        contenido = json.dumps([nombre, self.version, list(args)], sort_keys=True, default=str)
+        return hashlib.sha256(contenido.encode()).hexdigest()
+
+    def memoizar(self, nombre):
+        def decorador(funcion):
+            @functools.wraps(funcion)
+            def envoltorio(*args):
+                clave = self.clave(nombre, args)
+                try:
+                    guardado = self.backend.get(clave)
+                except Exception:
+                    guardado = None
+                if guardado is not None:
+                    self.aciertos += 1
+                    return pickle.loads(guardado)
+
+                self.fallos += 1
+                resultado = funcion(*args)
+                # Los mensajes de error no se guardan
+                if not es_error(resultado):
+                    try:
+                        self.backend.set(clave, pickle.dumps(resultado, protocol=pickle.HIGHEST_PROTOCOL))
+                    except Exception as e:
+                        print("❌ Error guardando en cache", e)
+                return resultado
+            return envoltorio
+        return decorador
+
+    def tasa_aciertos(self):
+        total = self.aciertos + self.fallos
+        return self.aciertos / total if total else 0.0
@@ -0,0 +1,244 @@
+import hashlib
+import os
+import queue
+import sqlite3
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# -----------------------
+# 🔹 Configuración
+# -----------------------
+BASE = os.path.dirname(os.path.abspath(__file__))
+ARTIFACTS_DIR = os.environ.get("ARTIFACTS_DIR", BASE)
+REGISTRO_NOMBRE = "ShadowScoring.sqlite3"
+SHADOW_WORKERS = int(os.environ.get("SHADOW_WORKERS", 2))
+SHADOW_MAX_PENDIENTES = int(os.environ.get("SHADOW_MAX_PENDIENTES", 64))
+VARIABLES_ENRUTAMIENTO = ["MODELOS_AB_REGRESION", "MODELOS_SHADOW_REGRESION",
+                          "MODELOS_AB_CLASIFICACION", "MODELOS_SHADOW_CLASIFICACION"]
+
+
+def leer_variantes(variable):
+    # "modelo.pkl:0.1,otro.pkl:0.2" -> [("modelo.pkl", 0.1), ("otro.pkl", 0.2)]; sin peso = 0
+    variantes = []
+    for parte in filter(None, (p.strip() for p in os.environ.get(variable, "").split(","))):
+        archivo, _, peso = parte.partition(":")
+        variantes.append((archivo, float(peso) if peso else 0.0))
+    return variantes
+
+
+def version_enrutamiento(base=BASE, variables=VARIABLES_ENRUTAMIENTO):
+    # Variantes y shadows configurados (archivo, peso y contenido) para la
+    # versión de la cache de resultados; "" si no hay ninguno
+    h = hashlib.sha256()
+    configurado = False
+    for variable in variables:
+        for archivo, peso in leer_variantes(variable):
+            configurado = True
+            h.update(f"{variable}={archivo}:{peso}".encode())
+            ruta = os.path.join(base, archivo)
+            if os.path.exists(ruta):
+                with open(ruta, "rb") as f:
+                    h.update(f.read())
+    return h.hexdigest()[:12] if configurado else ""
+
+
+class RegistroScoring:
+    """Guarda latencias y diferencias en SQLite desde un hilo propio.
+
+    Las predicciones solo encolan el registro (put_nowait); si la cola está
+    llena el registro se descarta en lugar de bloquear la petición.
+    """
+
+    def __init__(self, ruta=None, max_cola=10000):
+        self.ruta = ruta or os.path.join(ARTIFACTS_DIR, REGISTRO_NOMBRE)
+        self.cola = queue.Queue(maxsize=max_cola)
+        self.descartados = 0
+        threading.Thread(target=self._escribir, daemon=True).start()
+
+    def registrar(self, enrutador, modelo, rol, latencia_ms, diferencia=None):
+        try:
+            self.cola.put_nowait((time.time(), enrutador, modelo, rol, latencia_ms, diferencia))
+        except queue.Full:
+            self.descartados += 1
+
+    def _escribir(self):
+        try:
+            os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+            con = sqlite3.connect(self.ruta, timeout=5, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("""CREATE TABLE IF NOT EXISTS scoring (
+                momento REAL, enrutador TEXT, modelo TEXT, rol TEXT, latencia_ms REAL, diferencia REAL)""")
+        except (OSError, sqlite3.Error) as e:
+            # Sin registro las predicciones siguen; la cola se llena y se descarta
+            print(f"❌ No se pudo abrir el registro de scoring {self.ruta}", e)
+            return
+        while True:
+            filas = [self.cola.get()]
+            # Se escribe por lotes lo que se haya acumulado
+            while len(filas) < 500:
+                try:
+                    filas.append(self.cola.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                con.executemany("INSERT INTO scoring VALUES (?, ?, ?, ?, ?, ?)", filas)
+            except Exception as e:
+                print("❌ Error registrando scoring", e)
+
+
+class EnrutadorModelos:
+    """Sirve el modelo primario (o una variante A/B) y evalúa shadows en segundo plano.
+
+    - A/B: cada variante recibe una fracción del tráfico; la asignación se
+      hace con un hash de la entrada, así que la misma entrada siempre va al
+      mismo modelo. La cache de resultados solo es válida para una misma
+      configuración: por eso su versión incluye version_enrutamiento(). Los
+      aciertos de cache no pasan por el enrutador (ni latencias ni shadows).
+    - Shadow: los modelos shadow se evalúan en un ThreadPoolExecutor fuera
+      de la petición. Si ya hay demasiados trabajos pendientes, el trabajo
+      shadow se descarta.
+    - Cualquier otro atributo (coef_, classes_, ...) se delega al primario.
+      Para explicar una predicción usar resolver(), que devuelve el modelo
+      que realmente la sirvió.
+    """
+
+    def __init__(self, nombre, primario, variantes_ab=None, shadows=None, registro=None,
+                 workers=SHADOW_WORKERS, max_pendientes=SHADOW_MAX_PENDIENTES):
+        self.nombre = nombre
+        self.primario = primario
+        self.variantes_ab = variantes_ab or []  # [(nombre, modelo, peso)]
+        self.shadows = shadows or []  # [(nombre, modelo)]
+        self.registro = registro
+        self.descartados = 0
+        self._pendientes = threading.BoundedSemaphore(max_pendientes)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"shadow-{nombre}") \
+            if self.shadows else None
+
+    def __getattr__(self, atributo):
+        return getattr(self.__dict__["primario"], atributo)
+
+    def _elegir(self, X):
+        if not self.variantes_ab:
+            return "primario", self.primario
+        # Posición en [0, 1) a partir del contenido de la entrada
+        try:
+            contenido = np.ascontiguousarray(np.asarray(X, dtype=float)).tobytes()
+        except (TypeError, ValueError):
+            return "primario", self.primario
+        h = hashlib.blake2b(contenido, digest_size=8)
+        posicion = int.from_bytes(h.digest(), "big") / 2 ** 64
+        acumulado = 0.0
+        for nombre, modelo, peso in self.variantes_ab:
+            acumulado += peso
+            if posicion < acumulado:
+                return nombre, modelo
+        return "primario", self.primario
+
+    def resolver(self, X):
+        return ModeloResuelto(self, *self._elegir(X))
+
+    def _servir(self, metodo, X, eleccion=None):
+        nombre, modelo = eleccion or self._elegir(X)
+        inicio = time.perf_counter()
+        resultado = getattr(modelo, metodo)(X)
+        latencia = (time.perf_counter() - inicio) * 1000
+        if self.registro is not None:
+            self.registro.registrar(self.nombre, nombre, "servido", latencia)
+        if self._executor is not None:
+            self._lanzar_shadows(metodo, X, resultado)
+        return resultado
+
+    def _lanzar_shadows(self, metodo, X, resultado):
+        for nombre, modelo in self.shadows:
+            if not self._pendientes.acquire(blocking=False):
+                # Bajo carga: se descarta el trabajo shadow
+                self.descartados += 1
+                continue
+            try:
+                self._executor.submit(self._evaluar_shadow, nombre, modelo, metodo, X, resultado)
+            except RuntimeError:
+                self._pendientes.release()
+
+    def _evaluar_shadow(self, nombre, modelo, metodo, X, resultado):
+        try:
+            inicio = time.perf_counter()
+            sombra = getattr(modelo, metodo)(X)
+            latencia = (time.perf_counter() - inicio) * 1000
+            try:
+                diferencia = float(np.max(np.abs(np.asarray(sombra, dtype=float) - np.asarray(resultado, dtype=float))))
+            except (TypeError, ValueError):
+                # Etiquetas no numéricas: fracción de predicciones distintas
+                diferencia = float(np.mean(np.asarray(sombra) != np.asarray(resultado)))
+            if self.registro is not None:
+                self.registro.registrar(self.nombre, nombre, "shadow", latencia, diferencia)
+        except Exception:
+            traceback.print_exc()
+        finally:
+            self._pendientes.release()
+
+    def predict(self, X):
+        return self._servir("predict", X)
+
+    def predict_proba(self, X):
+        return self._servir("predict_proba", X)
+
+
+class ModeloResuelto:
+    """Una petición ya asignada a un modelo (primario o variante A/B).
+
+    predict/predict_proba registran y lanzan shadows como el enrutador, sin
+    volver a elegir. `modelo` es el estimador que sirvió la petición: las
+    explicaciones lo usan directamente, sin pasar por el enrutador.
+    """
+
+    def __init__(self, enrutador, nombre, modelo):
+        self.enrutador = enrutador
+        self.nombre = nombre
+        self.modelo = modelo
+
+    def _servir(self, metodo, X):
+        if self.enrutador is None:
+            return getattr(self.modelo, metodo)(X)
+        return self.enrutador._servir(metodo, X, (self.nombre, self.modelo))
+
+    def predict(self, X):
+        return self._servir("predict", X)
+
+    def predict_proba(self, X):
+        return self._servir("predict_proba", X)
+
+
+def resolver(modelo, X):
+    """ModeloResuelto para X, tanto si `modelo` es un enrutador como si no."""
+    if isinstance(modelo, EnrutadorModelos):
+        return modelo.resolver(X)
+    return ModeloResuelto(None, "primario", modelo)
+
+
+def sin_enrutador(modelo):
+    # Puntuación por lotes: siempre el primario, sin A/B ni shadows
+    return modelo.primario if isinstance(modelo, EnrutadorModelos) else modelo
+
+
+def crear_enrutador(nombre, primario, cargar_modelo, variable_ab, variable_shadow, registro):
+    """Envuelve `primario` si hay variantes A/B o shadows configuradas en el entorno."""
+    variantes_ab, shadows = [], []
+    for archivo, peso in leer_variantes(variable_ab):
+        try:
+            variantes_ab.append((archivo, cargar_modelo(archivo), peso))
+            print(f"✅ Variante A/B de {nombre} cargada: {archivo} ({peso:.0%})")
+        except Exception as e:
+            print(f"❌ Error cargando variante A/B {archivo}", e)
+    for archivo, _ in leer_variantes(variable_shadow):
+        try:
+            shadows.append((archivo, cargar_modelo(archivo)))
+            print(f"✅ Modelo shadow de {nombre} cargado: {archivo}")
+        except Exception as e:
+            print(f"❌ Error cargando modelo shadow {archivo}", e)
+    if primario is None or not (variantes_ab or shadows):
+        return primario
+    return EnrutadorModelos(nombre, primario, variantes_ab, shadows, registro)
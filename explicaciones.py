@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------
+# 🔹 Variables que el usuario controla en la pestaña de clasificación
+# -----------------------
+ETIQUETAS = {
+    'age': 'Edad',
+    'workclass': 'Clase de Trabajo',
+    'education': 'Educación',
+    'marital-status': 'Estado Civil',
+    'occupation': 'Ocupación',
+    'sex': 'Sexo',
+    'hours-per-week': 'Horas por Semana',
+    'native-country': 'País de Origen',
+}
+
+# Rejilla de referencia para variables numéricas (mismo rango que los inputs)
+REFERENCIAS_NUMERICAS = {
+    'age': np.linspace(17, 90, 9),
+    'hours-per-week': np.linspace(1, 99, 9),
+}
+
+
+def referencias(columna, label_encoders):
+    # Categóricas: todos los códigos del encoder; numéricas: la rejilla
+    if columna in label_encoders:
+        return np.arange(len(label_encoders[columna].classes_), dtype=float)
+    return REFERENCIAS_NUMERICAS[columna]
+
+
+def _probabilidad_positiva(modelo, X):
+    return modelo.predict_proba(X)[:, 1]
+
+
+def atribuciones_lineales(modelo, X_encoded, label_encoders):
+    # Exacto para modelos lineales: coef * (x - media de referencia), en log-odds
+    coef = np.ravel(modelo.coef_[0] if np.ndim(modelo.coef_) > 1 else modelo.coef_)
+    columnas = list(X_encoded.columns)
+    fila = X_encoded.iloc[0]
+    resultado = {}
+    for columna in ETIQUETAS:
+        j = columnas.index(columna)
+        resultado[columna] = coef[j] * (float(fila[columna]) - referencias(columna, label_encoders).mean())
+    return resultado
+
+
+def atribuciones_oclusion(modelo, X_encoded, label_encoders):
+    """Oclusión por lotes: una sola llamada a predict_proba.
+
+    Para cada variable se sustituye su valor por todas sus referencias; la
+    contribución es la probabilidad actual menos la media de esas
+    probabilidades. Todas las filas perturbadas van en una única matriz.
+    """
+    base = X_encoded.iloc[[0]]
+    bloques, tramos = [], {}
+    inicio = 1
+    for columna in ETIQUETAS:
+        valores = referencias(columna, label_encoders)
+        bloque = pd.concat([base] * len(valores), ignore_index=True)
+        bloque[columna] = valores.astype(bloque[columna].dtype, copy=False)
+        bloques.append(bloque)
+        tramos[columna] = (inicio, inicio + len(valores))
+        inicio += len(valores)
+
+    matriz = pd.concat([base.reset_index(drop=True)] + bloques, ignore_index=True)
+    probabilidades = _probabilidad_positiva(modelo, matriz)
+    actual = probabilidades[0]
+    return {columna: actual - probabilidades[a:b].mean() for columna, (a, b) in tramos.items()}
+
+
+def explicar(modelo, X_encoded, label_encoders):
+    """Devuelve (DataFrame Variable/Contribución ordenado, unidad)."""
+    if hasattr(modelo, 'coef_'):
+        contribuciones, unidad = atribuciones_lineales(modelo, X_encoded, label_encoders), "log-odds >50K"
+    else:
+        contribuciones, unidad = atribuciones_oclusion(modelo, X_encoded, label_encoders), "Δ probabilidad >50K"
+
+    df = pd.DataFrame({
+        'Variable': [ETIQUETAS[c] for c in contribuciones],
+        'Contribución': list(contribuciones.values()),
+    })
+    orden = df['Contribución'].abs().sort_values().index
+    return df.loc[orden].reset_index(drop=True), unidad
@@ -0,0 +1,210 @@
+import json
+import os
+import sys
+import traceback
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from enrutador_modelos import VARIABLES_ENRUTAMIENTO, leer_variantes
+from inferencia_numpy import ARTIFACTS_DIR, BASE, PAQUETE_NOMBRE, cargar_paquete
+
+# Exporta los pickles de scikit-learn a un paquete NumPy (.npz + .json) que
+# inferencia_numpy.py puede servir sin importar scikit-learn, y verifica que
+# las predicciones sean idénticas bit a bit.
+#
+# Uso: python exportar_modelos.py [directorio_salida]
+#
+# También se exportan las variantes A/B y shadow de MODELOS_AB_* y
+# MODELOS_SHADOW_* presentes en el entorno al exportar (p. ej. en el build de
+# Docker); las que falten en el paquete la app las carga con joblib.
+
+ARTEFACTOS = ["RegresionSa.pkl", "ClasificacionDe.pkl", "AgrupamientoSa.pkl",
+              "label_encoders.pkl", "income_encoder.pkl", "SegmentacionOnline.pkl"]
+# El checkpoint de segmentación lo escribe el entrenamiento online en ARTIFACTS_DIR
+EN_ARTIFACTS_DIR = {"SegmentacionOnline.pkl"}
+
+
+def artefactos_a_exportar():
+    variantes = [archivo for variable in VARIABLES_ENRUTAMIENTO for archivo, _ in leer_variantes(variable)]
+    return ARTEFACTOS + [a for a in dict.fromkeys(variantes) if a not in ARTEFACTOS]
+
+COLUMNAS_CLASIFICACION = ['age', 'workclass', 'fnlwgt', 'education', 'education-num',
+                          'marital-status', 'occupation', 'relationship', 'race', 'sex',
+                          'capital-gain', 'capital-loss', 'hours-per-week', 'native-country']
+
+
+# -----------------------
+# 🔹 Conversión de estimadores
+# -----------------------
+def _nombres_variables(modelo):
+    nombres = getattr(modelo, 'feature_names_in_', None)
+    return [str(n) for n in nombres] if nombres is not None else None
+
+
+def _exportar_arbol(arbol, prefijo, arrays):
+    t = arbol.tree_
+    arrays[f"{prefijo}/izquierda"] = t.children_left.astype(np.int64)
+    arrays[f"{prefijo}/derecha"] = t.children_right.astype(np.int64)
+    arrays[f"{prefijo}/variable"] = t.feature.astype(np.int64)
+    arrays[f"{prefijo}/umbral"] = t.threshold
+    arrays[f"{prefijo}/valor"] = t.value
+
+
+def exportar_estimador(nombre, modelo, arrays):
+    clase = type(modelo).__name__
+
+    if isinstance(modelo, dict):
+        return {"tipo": "codificadores",
+                "classes": {col: [str(c) for c in le.classes_] for col, le in modelo.items()}}
+
+    if clase == "LabelEncoder":
+        return {"tipo": "codificador", "classes": [str(c) for c in modelo.classes_]}
+
+    if clase in ("LinearRegression", "Ridge", "Lasso", "ElasticNet"):
+        arrays[f"{nombre}/coef"] = modelo.coef_
+        arrays[f"{nombre}/intercept"] = np.asarray(modelo.intercept_)
+        return {"tipo": "regresion_lineal", "feature_names": _nombres_variables(modelo)}
+
+    if clase == "StandardScaler":
+        arrays[f"{nombre}/mean"] = modelo.mean_
+        arrays[f"{nombre}/scale"] = modelo.scale_
+        return {"tipo": "escalador"}
+
+    if clase in ("KMeans", "MiniBatchKMeans"):
+        arrays[f"{nombre}/centros"] = modelo.cluster_centers_
+        return {"tipo": "kmedias"}
+
+    if clase == "LogisticRegression":
+        multi_class = getattr(modelo, 'multi_class', 'auto')
+        ovr = multi_class in ("ovr", "warn") or (
+            multi_class in ("auto", "deprecated")
+            and (modelo.classes_.size <= 2 or modelo.solver == "liblinear"))
+        arrays[f"{nombre}/coef"] = modelo.coef_
+        arrays[f"{nombre}/intercept"] = modelo.intercept_
+        arrays[f"{nombre}/classes"] = modelo.classes_
+        return {"tipo": "regresion_logistica", "ovr": bool(ovr)}
+
+    if clase in ("DecisionTreeClassifier", "RandomForestClassifier", "ExtraTreesClassifier"):
+        bosque = clase != "DecisionTreeClassifier"
+        arboles = modelo.estimators_ if bosque else [modelo]
+        for i, arbol in enumerate(arboles):
+            _exportar_arbol(arbol, f"{nombre}/arbol{i}", arrays)
+        arrays[f"{nombre}/classes"] = modelo.classes_
+        return {"tipo": "arboles", "n_arboles": len(arboles), "bosque": bosque}
+
+    if clase == "SegmentadorOnline":
+        arrays[f"{nombre}/mean"] = modelo.scaler.mean_
+        arrays[f"{nombre}/scale"] = modelo.scaler.scale_
+        arrays[f"{nombre}/centros"] = modelo.kmeans.cluster_centers_
+        return {"tipo": "segmentacion",
+                "nombres": {str(k): v for k, v in modelo.nombres_segmentos().items()}}
+
+    raise ValueError(f"Estimador no soportado para exportar: {clase}")
+
+
+# -----------------------
+# 🔹 Verificación de paridad
+# -----------------------
+def datos_prueba(n=2000, semilla=0):
+    rng = np.random.default_rng(semilla)
+    paises = pd.DataFrame({
+        'GDP per capita': rng.uniform(0.1, 2.0, n),
+        'Social support': rng.uniform(0, 1, n),
+        'Healthy life expectancy': rng.uniform(0, 1, n),
+        'Freedom to make life choices': rng.uniform(0, 0.8, n),
+        'Generosity': rng.uniform(0, 0.5, n),
+        'Perceptions of corruption': rng.uniform(0, 1, n),
+    })
+    clientes = pd.DataFrame({
+        'Gasto': rng.uniform(1, 5000, n),
+        'Transacciones': rng.integers(1, 100, n),
+        'Productos': rng.integers(1, 200, n),
+    })
+    return paises, clientes, rng
+
+
+def _comparar(nombre, esperado, obtenido, errores):
+    esperado, obtenido = np.asarray(esperado), np.asarray(obtenido)
+    if esperado.shape != obtenido.shape or not np.array_equal(esperado, obtenido):
+        diferencia = (np.abs(esperado.astype(float) - obtenido.astype(float)).max()
+                      if esperado.shape == obtenido.shape and esperado.dtype.kind in "fiu" else "forma/tipo")
+        errores.append(f"{nombre}: diferencia máxima {diferencia}")
+
+
+def verificar_paridad(originales, exportados):
+    paises, clientes, rng = datos_prueba()
+    errores = []
+
+    for archivo, modelo in originales.items():
+        nuevo = exportados[archivo]
+        clase = type(modelo).__name__
+
+        if isinstance(modelo, dict):
+            for col, le in modelo.items():
+                muestra = rng.choice(le.classes_, 500)
+                _comparar(f"{archivo}[{col}].transform", le.transform(muestra), nuevo[col].transform(muestra), errores)
+        elif clase == "LabelEncoder":
+            codigos = rng.integers(0, len(modelo.classes_), 500)
+            _comparar(f"{archivo}.inverse_transform", modelo.inverse_transform(codigos),
+                      nuevo.inverse_transform(codigos), errores)
+        elif clase == "SegmentadorOnline":
+            _comparar(f"{archivo}.predecir", modelo.predecir(clientes), nuevo.predecir(clientes), errores)
+        elif hasattr(modelo, 'predict_proba'):
+            X = _entradas_clasificacion(modelo, originales.get("label_encoders.pkl"), rng)
+            _comparar(f"{archivo}.predict_proba", modelo.predict_proba(X), nuevo.predict_proba(X), errores)
+            _comparar(f"{archivo}.predict", modelo.predict(X), nuevo.predict(X), errores)
+        elif hasattr(modelo, 'predict'):
+            _comparar(f"{archivo}.predict", modelo.predict(paises), nuevo.predict(paises), errores)
+
+    return errores
+
+
+def _entradas_clasificacion(modelo, label_encoders, rng, n=2000):
+    columnas = _nombres_variables(modelo) or COLUMNAS_CLASIFICACION
+    datos = {}
+    for col in columnas:
+        if label_encoders and col in label_encoders:
+            datos[col] = rng.integers(0, len(label_encoders[col].classes_), n)
+        else:
+            datos[col] = rng.integers(0, 100000 if col == 'fnlwgt' else 100, n)
+    return pd.DataFrame(datos, columns=columnas)
+
+
+# -----------------------
+# 🔹 Exportación
+# -----------------------
+def exportar(directorio_entrada=BASE, directorio_salida=BASE, directorio_artefactos=ARTIFACTS_DIR):
+    originales, metadatos, arrays = {}, {}, {}
+    for archivo in artefactos_a_exportar():
+        directorio = directorio_artefactos if archivo in EN_ARTIFACTS_DIR else directorio_entrada
+        ruta = os.path.join(directorio, archivo)
+        if not os.path.exists(ruta):
+            print(f"⚠️ {archivo} no existe, se omite")
+            continue
+        try:
+            modelo = joblib.load(ruta)
+            metadatos[archivo] = exportar_estimador(archivo, modelo, arrays)
+            originales[archivo] = modelo
+            print(f"✅ {archivo} exportado ({type(modelo).__name__})")
+        except Exception as e:
+            print(f"❌ Error exportando {archivo}", e)
+            traceback.print_exc()
+
+    os.makedirs(directorio_salida, exist_ok=True)
+    np.savez_compressed(os.path.join(directorio_salida, PAQUETE_NOMBRE + ".npz"), **arrays)
+    with open(os.path.join(directorio_salida, PAQUETE_NOMBRE + ".json"), "w", encoding="utf-8") as f:
+        json.dump(metadatos, f, ensure_ascii=False, indent=2)
+
+    errores = verificar_paridad(originales, cargar_paquete(directorio_salida))
+    for error in errores:
+        print("❌ Paridad:", error)
+    if not errores:
+        print(f"✅ Paridad bit a bit verificada para {len(originales)} artefactos")
+    return errores
+
+
+if __name__ == "__main__":
+    salida = sys.argv[1] if len(sys.argv) > 1 else BASE
+    sys.exit(1 if exportar(BASE, salida) else 0)
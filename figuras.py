@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+from dash import Patch
+
+COLORES_SEGMENTO = {'Básico': '#e74c3c', 'Regular': '#f39c12', 'Premium': '#27ae60'}
+
+
+class PlantillaFigura:
+    """Figura base construida una sola vez; cada callback envía solo un Patch.
+
+    `construir` devuelve la figura completa (Plotly Express + layout). Se
+    llama en el arranque del worker y la figura resultante se pone en el
+    layout; después las actualizaciones solo tocan los datos de las trazas.
+    """
+
+    def __init__(self, construir):
+        self.figura = construir()
+        self.n_trazas = len(self.figura.data)
+
+    def base(self):
+        return self.figura
+
+    def parche(self, trazas=None, layout=None):
+        # trazas: {indice_traza: {propiedad: valor}}, admite claves anidadas con '.'
+        patch = Patch()
+        for indice, propiedades in (trazas or {}).items():
+            for ruta, valor in propiedades.items():
+                destino = patch['data'][indice]
+                *padres, ultimo = ruta.split('.')
+                for parte in padres:
+                    destino = destino[parte]
+                destino[ultimo] = valor
+        for ruta, valor in (layout or {}).items():
+            destino = patch['layout']
+            *padres, ultimo = ruta.split('.')
+            for parte in padres:
+                destino = destino[parte]
+            destino[ultimo] = valor
+        return patch
+
+
+# -----------------------
+# 🔹 Comparación de países (barras)
+# -----------------------
+def _construir_barras_felicidad():
+    vacio = pd.DataFrame({'País': pd.Series(dtype=str), 'Felicidad': pd.Series(dtype=float)})
+    fig = px.bar(vacio, x='País', y='Felicidad',
+                 title="Comparación de Índices de Felicidad",
+                 color='Felicidad', color_continuous_scale='viridis')
+    fig.update_layout(plot_bgcolor='white')
+    return fig
+
+
+class PlantillaBarrasFelicidad(PlantillaFigura):
+    def __init__(self):
+        super().__init__(_construir_barras_felicidad)
+
+    def actualizar(self, paises, felicidad, orden=None):
+        # orden: nombres en orden de ranking; fija el orden de las categorías del eje x
+        felicidad = np.asarray(felicidad, dtype=float).tolist()
+        layout = {}
+        if orden is not None:
+            layout = {'xaxis.categoryorder': 'array', 'xaxis.categoryarray': list(orden)}
+        return self.parche(
+            trazas={0: {'x': list(paises), 'y': felicidad, 'marker.color': felicidad}},
+            layout=layout,
+        )
+
+
+# -----------------------
+# 🔹 Clientes por segmento (dispersión)
+# -----------------------
+def _construir_dispersion_segmentos():
+    # Una fila por segmento para que Plotly Express cree una traza fija por color
+    semilla = pd.DataFrame({
+        'Gasto': [0.0] * len(COLORES_SEGMENTO),
+        'Transacciones': [0.0] * len(COLORES_SEGMENTO),
+        'Productos': [1.0] * len(COLORES_SEGMENTO),
+        'Segmento': list(COLORES_SEGMENTO),
+        'Cliente': [''] * len(COLORES_SEGMENTO),
+    })
+    fig = px.scatter(semilla, x='Gasto', y='Transacciones',
+                     size='Productos', color='Segmento',
+                     hover_data=['Cliente'],
+                     title="Comparación de Clientes por Segmento",
+                     color_discrete_map=COLORES_SEGMENTO,
+                     category_orders={'Segmento': list(COLORES_SEGMENTO)})
+    fig.update_layout(plot_bgcolor='white')
+    # Se vacían las trazas: la figura base no muestra clientes ficticios
+    fig.for_each_trace(lambda t: t.update(x=[], y=[], customdata=[], marker_size=[]))
+    return fig
+
+
+class PlantillaDispersionSegmentos(PlantillaFigura):
+    def __init__(self):
+        super().__init__(_construir_dispersion_segmentos)
+        # Misma escala de tamaño que usa Plotly Express: sizeref es proporcional
+        # al máximo de Productos, que en la semilla vale 1
+        self._factor_sizeref = self.figura.data[0].marker.sizeref
+        self._indices = {t.name: i for i, t in enumerate(self.figura.data)}
+
+    def actualizar(self, df_clientes):
+        sizeref = self._factor_sizeref * float(df_clientes['Productos'].max())
+        trazas = {}
+        for segmento, indice in self._indices.items():
+            filas = df_clientes[df_clientes['Segmento'] == segmento]
+            trazas[indice] = {
+                'x': filas['Gasto'].tolist(),
+                'y': filas['Transacciones'].tolist(),
+                'customdata': [[c] for c in filas['Cliente']],
+                'marker.size': filas['Productos'].tolist(),
+                'marker.sizeref': sizeref,
+                'showlegend': not filas.empty,
+            }
+        return self.parche(trazas=trazas)
+
+
+# -----------------------
+# 🔹 Atribuciones de clasificación (barras horizontales)
+# -----------------------
+def _construir_barras_atribuciones():
+    vacio = pd.DataFrame({'Variable': pd.Series(dtype=str), 'Contribución': pd.Series(dtype=float)})
+    fig = px.bar(vacio, x='Contribución', y='Variable', orientation='h',
+                 title="¿Qué variables influyen en la predicción?")
+    fig.update_layout(plot_bgcolor='white', xaxis_zeroline=True, xaxis_zerolinecolor='#7f8c8d')
+    return fig
+
+
+class PlantillaAtribuciones(PlantillaFigura):
+    def __init__(self):
+        super().__init__(_construir_barras_atribuciones)
+
+    def actualizar(self, df_atribuciones, unidad):
+        valores = df_atribuciones['Contribución'].astype(float).tolist()
+        colores = ['#27ae60' if v >= 0 else '#e74c3c' for v in valores]
+        return self.parche(
+            trazas={0: {'x': valores, 'y': df_atribuciones['Variable'].tolist(), 'marker.color': colores}},
+            layout={'xaxis.title.text': f"Contribución ({unidad})"},
+        )
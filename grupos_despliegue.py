@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import threading
+
+from flask import Response, g, request
+
+# -----------------------
+# 🔹 Grupos de rutas
+# -----------------------
+# Con PERFIL=grupos cada grupo corre en su propio pool de gunicorn detrás de
+# nginx (iniciar_grupos.sh). Sin GRUPO el proceso sirve todas las rutas,
+# como en el Procfile.
+GRUPO = os.environ.get("GRUPO")
+
+
+def _config(grupo, clave, defecto):
+    # GRUPO_LOTES_WORKERS=2, GRUPO_INTERACTIVO_THREADS=16, ...
+    return int(os.environ.get(f"GRUPO_{grupo.upper()}_{clave.upper()}", defecto))
+
+
+def _grupo(nombre, puerto, workers, max_concurrentes, timeout, holgura=2):
+    # Los hilos son el cupo más una holgura: con todo el cupo ocupado todavía
+    # queda un hilo libre para responder 503 en vez de dejar la petición en
+    # la cola de gunicorn.
+    max_concurrentes = _config(nombre, 'max_concurrentes', max_concurrentes)
+    return {
+        'puerto': _config(nombre, 'puerto', puerto),
+        'workers': _config(nombre, 'workers', workers),
+        'threads': _config(nombre, 'threads', max_concurrentes + holgura),
+        'timeout': _config(nombre, 'timeout', timeout),
+        'max_concurrentes': max_concurrentes,
+    }
+
+
+GRUPOS = {
+    # Callbacks de Dash: sliders, formularios y pestañas
+    'interactivo': _grupo('interactivo', 8001, workers=2, max_concurrentes=8, timeout=30),
+    # Scoring Arrow/Parquet en /api/*: pocos hilos y timeout largo
+    'lotes': _grupo('lotes', 8002, workers=1, max_concurrentes=2, timeout=300),
+    # Layout, dependencias, bundles JS y assets
+    'estatico': _grupo('estatico', 8003, workers=1, max_concurrentes=4, timeout=30),
+}
+
+# Callbacks que arman varias filas o explicaciones: dentro del grupo
+# interactivo tienen un cupo propio por worker para no ocupar todos los hilos
+# que necesitan los sliders.
+CALLBACKS_PESADOS = ('comparison-graph', 'clustering-multiple-graph', 'classification-explanation')
+MAX_PESADOS = int(os.environ.get("MAX_CALLBACKS_PESADOS", 2))
+
+# Diagnóstico por worker (p. ej. /debug/memoria): lo sirve cualquier pool,
+# fuera de los grupos y de sus cupos.
+PREFIJO_DEBUG = '/debug/'
+
+
+def grupo_de(ruta):
+    if ruta.startswith('/api/'):
+        return 'lotes'
+    if ruta.endswith('/_dash-update-component'):
+        return 'interactivo'
+    return 'estatico'
+
+
+def _es_pesado():
+    try:
+        # Flask guarda el JSON parseado; Dash lo reutiliza sin volver a leerlo
+        salida = (request.get_json(silent=True) or {}).get('output', '')
+    except Exception:
+        return False
+    return any(componente in salida for componente in CALLBACKS_PESADOS)
+
+
+# -----------------------
+# 🔹 Límites de concurrencia
+# -----------------------
+def registrar_limites(server):
+    """Límite de peticiones simultáneas por grupo (y de callbacks pesados) en cada worker.
+
+    Al superar el límite se responde 503 con Retry-After en lugar de dejar
+    la petición esperando un hilo: así un lote grande o varias
+    comparaciones no bloquean a los sliders. Si el proceso tiene GRUPO, las
+    rutas de otro grupo se rechazan con 421 (solo llegan saltándose nginx).
+    Las rutas bajo /debug/ quedan fuera: cada pool responde las suyas.
+    """
+    semaforos = {nombre: threading.BoundedSemaphore(c['max_concurrentes']) for nombre, c in GRUPOS.items()}
+    semaforos['pesado'] = threading.BoundedSemaphore(MAX_PESADOS)
+
+    @server.before_request
+    def _entrar_grupo():
+        if request.path.startswith(PREFIJO_DEBUG):
+            return None
+        grupo = grupo_de(request.path)
+        if GRUPO and grupo != GRUPO:
+            return Response(f"❌ Ruta del grupo '{grupo}', este proceso sirve '{GRUPO}'", status=421)
+        cupos = [grupo] + (['pesado'] if grupo == 'interactivo' and _es_pesado() else [])
+        tomados = []
+        for cupo in cupos:
+            if not semaforos[cupo].acquire(blocking=False):
+                for t in tomados:
+                    semaforos[t].release()
+                return Response(f"⏳ Grupo '{cupo}' saturado, reintentar", status=503, headers={'Retry-After': '1'})
+            tomados.append(cupo)
+        g.cupos_grupo = tomados
+
+    @server.teardown_request
+    def _salir_grupo(exc):
+        for cupo in g.pop('cupos_grupo', []):
+            semaforos[cupo].release()
+
+
+# -----------------------
+# 🔹 Configuración de nginx
+# -----------------------
+def configuracion_nginx(puerto, directorio_temporal="/tmp/nginx-grupos"):
+    upstreams = "\n".join(
+        f"    upstream {nombre} {{ server 127.0.0.1:{c['puerto']}; keepalive {c['threads'] * c['workers']}; }}"
+        for nombre, c in GRUPOS.items()
+    )
+    return f"""worker_processes 1;
+pid {directorio_temporal}/nginx.pid;
+error_log stderr warn;
+
+events {{ worker_connections 1024; }}
+
+http {{
+    access_log off;
+    client_body_temp_path {directorio_temporal}/body;
+    proxy_temp_path {directorio_temporal}/proxy;
+    proxy_cache_path {directorio_temporal}/cache keys_zone=estatico:10m max_size=200m inactive=1d;
+    client_max_body_size 512m;
+
+{upstreams}
+
+    server {{
+        listen {puerto};
+        proxy_http_version 1.1;
+        proxy_set_header Connection "";
+        proxy_set_header Host $host;
+        proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for;
+
+        # Scoring por lotes: cuerpo completo antes de ocupar un hilo de gunicorn
+        location /api/ {{
+            proxy_pass http://lotes;
+            proxy_request_buffering on;
+            proxy_read_timeout {GRUPOS['lotes']['timeout']}s;
+        }}
+
+        location = /_dash-update-component {{
+            proxy_pass http://interactivo;
+            proxy_read_timeout {GRUPOS['interactivo']['timeout']}s;
+        }}
+
+        # Los bundles de Dash llevan la versión en la URL: se cachean en nginx
+        location /_dash-component-suites/ {{
+            proxy_pass http://estatico;
+            proxy_cache estatico;
+            proxy_cache_valid 200 1d;
+        }}
+
+        location / {{
+            proxy_pass http://estatico;
+            proxy_read_timeout {GRUPOS['estatico']['timeout']}s;
+        }}
+    }}
+}}
+"""
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Perfil de despliegue por grupos de rutas")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_nginx = sub.add_parser("nginx", help="imprime la configuración de nginx")
+    p_nginx.add_argument("--puerto", type=int, default=int(os.environ.get("PORT", 10000)))
+    p_nginx.add_argument("--temporal", default="/tmp/nginx-grupos")
+    sub.add_parser("grupos", help="imprime la configuración de cada grupo")
+    args = parser.parse_args()
+
+    if args.comando == "nginx":
+        print(configuracion_nginx(args.puerto, args.temporal))
+    else:
+        print(json.dumps(GRUPOS, indent=2))
@@ -0,0 +1,24 @@
+# Configuración de gunicorn por grupo de rutas (GRUPO=interactivo|lotes|estatico).
+# Sin GRUPO no se cambia nada: el Procfile y el CMD por defecto del
+# Dockerfile siguen sirviendo todo con un solo pool.
+import os
+
+from grupos_despliegue import GRUPO, GRUPOS
+
+if GRUPO:
+    _grupo = GRUPOS[GRUPO]
+    bind = f"127.0.0.1:{_grupo['puerto']}"
+    workers = _grupo['workers']
+    threads = _grupo['threads']
+    if threads <= _grupo['max_concurrentes']:
+        print(f"⚠️ GRUPO {GRUPO}: {threads} hilos con cupo de {_grupo['max_concurrentes']}, "
+              "el 503 nunca se activa (las peticiones esperan en la cola de gunicorn)")
+    worker_class = "gthread"
+    timeout = _grupo['timeout']
+    proc_name = f"dashboard-{GRUPO}"
+    # Cola corta: si el grupo está saturado nginx devuelve el error enseguida
+    backlog = int(os.environ.get("GUNICORN_BACKLOG", 64))
+    if GRUPO == "lotes":
+        # Las tablas grandes fragmentan memoria: se recicla el worker cada tanto
+        max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 500))
+        max_requests_jitter = max_requests // 10
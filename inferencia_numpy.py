@@ -0,0 +1,269 @@
+import json
+import math
+import os
+
+import numpy as np
+
+# Runtime de inferencia solo con NumPy: reproduce las predicciones de los
+# estimadores de scikit-learn exportados por exportar_modelos.py sin
+# importar scikit-learn en los workers.
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+ARTIFACTS_DIR = os.environ.get("ARTIFACTS_DIR", BASE)
+PAQUETE_NOMBRE = "ModelosInferencia"
+SEGMENTACION_NOMBRE = "SegmentacionOnline.json"  # la escribe SegmentadorOnline.guardar
+
+
+def _matriz(X, dtype=None):
+    # Igual que validate_data de sklearn: conserva enteros y floats tal cual
+    # (int @ float no da el mismo resultado que float @ float) y convierte
+    # el resto a float64
+    if dtype is not None:
+        return np.asarray(X, dtype=dtype)
+    X = np.asarray(X)
+    return X if X.dtype.kind in "iuf" else X.astype(np.float64)
+
+
+def _expit(x):
+    # Se usa math.exp (libm) como scipy.special.expit: np.exp vectorizado puede
+    # diferir en el último bit y romper la paridad con sklearn
+    exp = np.fromiter((math.exp(-v) for v in x.ravel()), dtype=np.float64, count=x.size)
+    return (1.0 / (1.0 + exp)).reshape(x.shape)
+
+
+def _softmax(x):
+    x = x - x.max(axis=1).reshape((-1, 1))
+    np.exp(x, x)
+    x /= x.sum(axis=1).reshape((-1, 1))
+    return x
+
+
+# -----------------------
+# 🔹 Estimadores
+# -----------------------
+class RegresionLineal:
+    def __init__(self, coef, intercept, feature_names=None):
+        self.coef_ = coef
+        self.intercept_ = intercept if np.ndim(intercept) else float(intercept)
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object) if feature_names else None
+
+    def predict(self, X):
+        X = _matriz(X)
+        coef = self.coef_
+        return X @ coef + self.intercept_ if coef.ndim == 1 else X @ coef.T + self.intercept_
+
+
+class CodificadorEtiquetas:
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes, dtype=object)
+        self._indices = {c: i for i, c in enumerate(classes)}
+
+    def transform(self, y):
+        y = np.asarray(y, dtype=object).ravel()
+        try:
+            return np.array([self._indices[v] for v in y], dtype=np.int64)
+        except KeyError as e:
+            raise ValueError(f"y contains previously unseen labels: {e}")
+
+    def inverse_transform(self, y):
+        return self.classes_[np.asarray(y, dtype=np.int64)]
+
+
+class EscaladorEstandar:
+    def __init__(self, mean=None, scale=None):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X):
+        return (_matriz(X, dtype=np.float64) - self.mean_) / self.scale_
+
+    def inverse_transform(self, X):
+        return _matriz(X, dtype=np.float64) * self.scale_ + self.mean_
+
+
+class KMedias:
+    def __init__(self, centros):
+        self.cluster_centers_ = centros
+
+    def predict(self, X):
+        X = _matriz(X, dtype=np.float64)
+        distancias = ((X[:, None, :] - self.cluster_centers_[None, :, :]) ** 2).sum(axis=2)
+        return distancias.argmin(axis=1)
+
+
+class RegresionLogistica:
+    def __init__(self, coef, intercept, classes, ovr=True):
+        self.coef_ = coef
+        self.intercept_ = intercept
+        self.classes_ = np.asarray(classes)
+        self.ovr = ovr
+
+    def decision_function(self, X):
+        scores = _matriz(X) @ self.coef_.T + self.intercept_
+        return scores.reshape(-1) if scores.shape[1] == 1 else scores
+
+    def predict_proba(self, X):
+        decision = self.decision_function(X)
+        if self.ovr:
+            prob = _expit(decision)
+            if prob.ndim == 1:
+                return np.vstack([1 - prob, prob]).T
+            prob /= prob.sum(axis=1).reshape((prob.shape[0], -1))
+            return prob
+        if decision.ndim == 1:
+            decision = np.c_[-decision, decision]
+        return _softmax(decision)
+
+    def predict(self, X):
+        decision = self.decision_function(X)
+        indices = (decision > 0).astype(int) if decision.ndim == 1 else decision.argmax(axis=1)
+        return self.classes_[indices]
+
+
+class Arbol:
+    def __init__(self, izquierda, derecha, variable, umbral, valor):
+        self.izquierda = izquierda
+        self.derecha = derecha
+        self.variable = variable
+        self.umbral = umbral
+        self.valor = valor
+
+    def hojas(self, X32):
+        # Recorrido vectorizado: todas las filas avanzan un nivel por iteración
+        nodo = np.zeros(len(X32), dtype=np.int64)
+        filas = np.arange(len(X32))
+        activas = self.izquierda[nodo] != -1
+        while activas.any():
+            n = nodo[activas]
+            va_izquierda = X32[filas[activas], self.variable[n]] <= self.umbral[n]
+            nodo[activas] = np.where(va_izquierda, self.izquierda[n], self.derecha[n])
+            activas = self.izquierda[nodo] != -1
+        return nodo
+
+
+class ClasificadorArboles:
+    """Árbol de decisión o bosque aleatorio (promedio de árboles)."""
+
+    def __init__(self, arboles, classes, bosque=False):
+        self.arboles = arboles
+        self.classes_ = np.asarray(classes)
+        self.bosque = bosque
+
+    def predict_proba(self, X):
+        # sklearn evalúa los árboles en float32
+        X32 = _matriz(X, dtype=np.float32)
+        n_clases = len(self.classes_)
+        if not self.bosque:
+            arbol = self.arboles[0]
+            return arbol.valor[arbol.hojas(X32), 0, :n_clases]
+        proba = np.zeros((len(X32), n_clases), dtype=np.float64)
+        for arbol in self.arboles:
+            proba += arbol.valor[arbol.hojas(X32), 0, :n_clases]
+        proba /= len(self.arboles)
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+class SegmentacionEstatica:
+    """Instantánea de la segmentación online: misma interfaz que SegmentacionRecargable."""
+
+    def __init__(self, escalador, kmedias, nombres):
+        self.escalador = escalador
+        self.kmedias = kmedias
+        self.nombres = nombres
+        self.entrenado = True
+
+    def actual(self):
+        return self
+
+    def predecir(self, datos):
+        if hasattr(datos, 'columns'):
+            datos = datos[['Gasto', 'Transacciones', 'Productos']]
+        X = _matriz(datos, dtype=np.float64).reshape(-1, 3)
+        clusters = self.kmedias.predict(self.escalador.transform(X))
+        return [self.nombres[int(c)] for c in clusters]
+
+
+class SegmentacionRecargableNumpy:
+    """Como SegmentacionRecargable, pero sin sklearn: recarga la exportación JSON.
+
+    Cada checkpoint del entrenamiento online deja SegmentacionOnline.json en
+    ARTIFACTS_DIR; mientras no exista se usa la instantánea del paquete.
+    """
+
+    def __init__(self, respaldo=None, ruta=None):
+        self.ruta = ruta or os.path.join(ARTIFACTS_DIR, SEGMENTACION_NOMBRE)
+        self.respaldo = respaldo
+        self.modelo = None
+        self._mtime = None
+
+    def actual(self):
+        try:
+            mtime = os.path.getmtime(self.ruta)
+        except OSError:
+            return self.modelo or self.respaldo
+        if mtime != self._mtime:
+            try:
+                with open(self.ruta, encoding="utf-8") as f:
+                    self.modelo = segmentacion_desde_json(json.load(f))
+                self._mtime = mtime
+                print("✅ Segmentación online recargada (NumPy)")
+            except Exception as e:
+                print("❌ Error cargando segmentación online", e)
+        return self.modelo or self.respaldo
+
+
+# -----------------------
+# 🔹 Carga del paquete (.npz + .json)
+# -----------------------
+def _arbol(arrays, prefijo):
+    return Arbol(arrays[f"{prefijo}/izquierda"], arrays[f"{prefijo}/derecha"],
+                 arrays[f"{prefijo}/variable"], arrays[f"{prefijo}/umbral"],
+                 arrays[f"{prefijo}/valor"])
+
+
+def construir(nombre, meta, arrays):
+    tipo = meta["tipo"]
+    if tipo == "regresion_lineal":
+        return RegresionLineal(arrays[f"{nombre}/coef"], arrays[f"{nombre}/intercept"],
+                               meta.get("feature_names"))
+    if tipo == "codificador":
+        return CodificadorEtiquetas(meta["classes"])
+    if tipo == "codificadores":
+        return {col: CodificadorEtiquetas(classes) for col, classes in meta["classes"].items()}
+    if tipo == "escalador":
+        return EscaladorEstandar(arrays[f"{nombre}/mean"], arrays[f"{nombre}/scale"])
+    if tipo == "kmedias":
+        return KMedias(arrays[f"{nombre}/centros"])
+    if tipo == "regresion_logistica":
+        return RegresionLogistica(arrays[f"{nombre}/coef"], arrays[f"{nombre}/intercept"],
+                                  arrays[f"{nombre}/classes"], meta["ovr"])
+    if tipo == "arboles":
+        arboles = [_arbol(arrays, f"{nombre}/arbol{i}") for i in range(meta["n_arboles"])]
+        return ClasificadorArboles(arboles, arrays[f"{nombre}/classes"], meta["bosque"])
+    if tipo == "segmentacion":
+        return SegmentacionEstatica(
+            EscaladorEstandar(arrays[f"{nombre}/mean"], arrays[f"{nombre}/scale"]),
+            KMedias(arrays[f"{nombre}/centros"]),
+            {int(k): v for k, v in meta["nombres"].items()},
+        )
+    raise ValueError(f"Tipo de modelo no soportado: {tipo}")
+
+
+def segmentacion_desde_json(datos):
+    return SegmentacionEstatica(
+        EscaladorEstandar(np.array(datos["mean"]), np.array(datos["scale"])),
+        KMedias(np.array(datos["centros"])),
+        {int(k): v for k, v in datos["nombres"].items()},
+    )
+
+
+def cargar_paquete(directorio=BASE, nombre=PAQUETE_NOMBRE):
+    """Devuelve {archivo_pkl_original: estimador_numpy}."""
+    with open(os.path.join(directorio, nombre + ".json"), encoding="utf-8") as f:
+        metadatos = json.load(f)
+    with np.load(os.path.join(directorio, nombre + ".npz"), allow_pickle=False) as npz:
+        arrays = {k: npz[k] for k in npz.files}
+    return {archivo: construir(archivo, meta, arrays) for archivo, meta in metadatos.items()}
@@ -0,0 +1,222 @@
+import traceback
+
+import numpy as np
+import pandas as pd
+from flask import Response, request
+
+from enrutador_modelos import sin_enrutador
+from validacion import ESQUEMA_CLASIFICACION, ESQUEMA_CLUSTERING_LOTES, ESQUEMA_REGRESION, MODOS, validar_arrays
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# -----------------------
+# 🔹 Formatos y columnas
+# -----------------------
+TIPO_ARROW = "application/vnd.apache.arrow.stream"
+TIPO_PARQUET = "application/vnd.apache.parquet"
+
+COLUMNAS_REGRESION = ['GDP per capita', 'Social support', 'Healthy life expectancy',
+                      'Freedom to make life choices', 'Generosity', 'Perceptions of corruption']
+
+COLUMNAS_CLUSTERING = ['Gasto', 'Transacciones', 'Productos']
+
+# Mismos valores por defecto que usa el callback de clasificación
+DEFAULTS_CLASIFICACION = {
+    'age': 39,
+    'workclass': 'Private',
+    'fnlwgt': 77516,
+    'education': 'Bachelors',
+    'education-num': 13,
+    'marital-status': 'Never-married',
+    'occupation': 'Exec-managerial',
+    'relationship': 'Not-in-family',
+    'race': 'White',
+    'sex': 'Male',
+    'capital-gain': 0,
+    'capital-loss': 0,
+    'hours-per-week': 40,
+    'native-country': 'United-States'
+}
+
+
+def leer_tabla(cuerpo, tipo):
+    # El buffer envuelve los bytes del cuerpo sin copiarlos
+    buffer = pa.py_buffer(cuerpo)
+    if tipo.startswith(TIPO_PARQUET) or tipo.startswith("application/x-parquet"):
+        return pq.read_table(pa.BufferReader(buffer))
+    return pa.ipc.open_stream(buffer).read_all()
+
+
+def escribir_tabla(tabla):
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, tabla.schema) as writer:
+        writer.write_table(tabla)
+    return sink.getvalue()
+
+
+def columna_numpy(tabla, nombre, dtype=np.float64):
+    # Sin nulos y con un solo chunk del tipo correcto, NumPy ve el buffer de Arrow directamente
+    columna = tabla.column(nombre).cast(pa.from_numpy_dtype(dtype))
+    if columna.num_chunks == 1 and columna.null_count == 0:
+        return columna.chunk(0).to_numpy(zero_copy_only=True)
+    return columna.to_numpy().astype(dtype)
+
+
+def codificar_columna(tabla, nombre, encoder):
+    # Se codifica el diccionario (pocos valores distintos) y luego se indexa;
+    # los valores desconocidos se codifican como 0, igual que en el callback
+    columna = tabla.column(nombre).combine_chunks().dictionary_encode()
+    valores = columna.dictionary.to_numpy(zero_copy_only=False).astype(str)
+    clases = encoder.classes_.astype(str)
+    posiciones = np.searchsorted(clases, valores)
+    posiciones = np.minimum(posiciones, len(clases) - 1)
+    codigos = np.where(clases[posiciones] == valores, posiciones, 0)
+    indices = columna.indices.fill_null(0).to_numpy(zero_copy_only=False)
+    return codigos[indices]
+
+
+def validar_tabla(tabla, esquema, modo, categorias=None):
+    """Aplica el esquema a todas las filas de la tabla de una vez.
+
+    Devuelve (tabla, filas, errores): en modo 'descartar' la tabla queda solo
+    con las filas válidas y `filas` son sus posiciones en la entrada; en modo
+    'reparar' se reemplazan las columnas corregidas.
+    """
+    columnas = {}
+    for nombre, campo in esquema.items():
+        if nombre not in tabla.column_names:
+            continue
+        if campo['tipo'] == 'numero':
+            try:
+                columnas[nombre] = columna_numpy(tabla, nombre)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                # Texto u otro tipo: se convierte valor a valor en la validación
+                columnas[nombre] = tabla.column(nombre).to_numpy(zero_copy_only=False)
+        else:
+            columnas[nombre] = tabla.column(nombre).to_numpy(zero_copy_only=False)
+
+    salida, validas, errores = validar_arrays(esquema, columnas, modo, categorias)
+    if modo == 'descartar' and errores:
+        tabla = tabla.filter(pa.array(validas))
+    elif modo == 'reparar':
+        for nombre in errores:
+            tabla = tabla.set_column(tabla.column_names.index(nombre), nombre, pa.array(salida[nombre]))
+    return tabla, np.flatnonzero(validas), errores
+
+
+# -----------------------
+# 🔹 Scoring por lotes
+# -----------------------
+def puntuar_regresion(tabla, modelo):
+    columnas = [columna_numpy(tabla, c) for c in COLUMNAS_REGRESION]
+    if hasattr(modelo, 'coef_') and hasattr(modelo, 'intercept_'):
+        # Modelo lineal: combinación de columnas sin armar la matriz completa
+        prediccion = np.full(tabla.num_rows, float(modelo.intercept_))
+        for coef, columna in zip(modelo.coef_, columnas):
+            prediccion += coef * columna
+    else:
+        prediccion = modelo.predict(pd.DataFrame(dict(zip(COLUMNAS_REGRESION, columnas))))
+    return pa.table({'Felicidad': prediccion})
+
+
+def puntuar_clasificacion(tabla, modelo, label_encoders, income_encoder):
+    datos = {}
+    for columna, defecto in DEFAULTS_CLASIFICACION.items():
+        if columna not in tabla.column_names:
+            tabla = tabla.append_column(columna, pa.repeat(pa.scalar(defecto), tabla.num_rows))
+        if columna in label_encoders:
+            datos[columna] = codificar_columna(tabla, columna, label_encoders[columna])
+        else:
+            datos[columna] = columna_numpy(tabla, columna)
+
+    X = pd.DataFrame(datos, columns=list(DEFAULTS_CLASIFICACION))
+    probabilidades = modelo.predict_proba(X)
+    clases = probabilidades.argmax(axis=1)
+    return pa.table({
+        'Ingreso': income_encoder.inverse_transform(modelo.classes_[clases]).astype(str),
+        'Confianza': probabilidades.max(axis=1),
+        'Probabilidad >50K': probabilidades[:, 1],
+    })
+
+
+def puntuar_clustering(tabla, segmentacion=None):
+    gasto, transacciones, productos = (columna_numpy(tabla, c) for c in COLUMNAS_CLUSTERING)
+    modelo = segmentacion.actual() if segmentacion is not None else None
+    if modelo is not None:
+        segmentos = np.asarray(modelo.predecir(np.column_stack([gasto, transacciones, productos])))
+    else:
+        segmentos = np.select([gasto < 250, gasto < 600], ["Básico", "Regular"], "Premium")
+    return pa.table({'Segmento': segmentos.astype(str)})
+
+
+# -----------------------
+# 🔹 Endpoints
+# -----------------------
+def registrar_endpoints(server, modelos):
+    """Registra /api/<modelo> en el servidor Flask de Dash.
+
+    `modelos` es una función que devuelve el diccionario de modelos
+    actuales, para que las rutas vean siempre lo que tiene cargado la app.
+
+    Las filas inválidas se tratan según ?invalidas=rechazar|descartar|reparar
+    (por defecto rechazar: 400 si alguna fila no cumple el esquema). Con
+    descartar, la respuesta incluye la columna 'Fila' con la posición de cada
+    fila puntuada en la entrada.
+    """
+
+    def responder(puntuar, esquema, categorias=None):
+        if pa is None:
+            return Response("❌ pyarrow no está instalado", status=501)
+        modo = request.args.get("invalidas", "rechazar")
+        if modo not in MODOS:
+            return Response(f"❌ invalidas debe ser uno de {', '.join(MODOS)}", status=400)
+        try:
+            tabla = leer_tabla(request.get_data(cache=False), request.content_type or TIPO_ARROW)
+        except Exception as e:
+            return Response(f"❌ Cuerpo Arrow/Parquet inválido: {e}", status=400)
+
+        n_filas = tabla.num_rows
+        tabla, filas, errores = validar_tabla(tabla, esquema, modo, categorias)
+        detalle = ", ".join(f"{esquema[c]['etiqueta']}: {n}" for c, n in errores.items())
+        if errores and modo == "rechazar":
+            return Response(f"⚠️ Filas inválidas por campo — {detalle}", status=400)
+        if modo == "descartar" and len(filas) == 0 and n_filas:
+            return Response(f"⚠️ Ninguna fila válida — {detalle}", status=400)
+        try:
+            resultado = puntuar(tabla)
+        except KeyError as e:
+            return Response(f"❌ Falta la columna {e}", status=400)
+        except Exception as e:
+            traceback.print_exc()
+            return Response(f"❌ Error en predicción: {e}", status=500)
+        if resultado is None:
+            return Response("❌ Modelo no disponible", status=503)
+        if modo == "descartar":
+            resultado = resultado.append_column('Fila', pa.array(filas, type=pa.int64()))
+        return Response(escribir_tabla(resultado).to_pybytes(), mimetype=TIPO_ARROW,
+                        headers={"X-Filas-Invalidas": str(n_filas - len(filas))})
+
+    @server.route("/api/regresion", methods=["POST"])
+    def api_regresion():
+        m = modelos()
+        return responder(lambda t: None if m['regresion'] is None else puntuar_regresion(t, sin_enrutador(m['regresion'])),
+                         ESQUEMA_REGRESION)
+
+    @server.route("/api/clasificacion", methods=["POST"])
+    def api_clasificacion():
+        m = modelos()
+        if m['clasificacion'] is None or m['label_encoders'] is None or m['income_encoder'] is None:
+            return responder(lambda t: None, ESQUEMA_CLASIFICACION)
+        categorias = {c: le.classes_ for c, le in m['label_encoders'].items()}
+        return responder(lambda t: puntuar_clasificacion(
+            t, sin_enrutador(m['clasificacion']), m['label_encoders'], m['income_encoder']), ESQUEMA_CLASIFICACION, categorias)
+
+    @server.route("/api/clustering", methods=["POST"])
+    def api_clustering():
+        m = modelos()
+        return responder(lambda t: puntuar_clustering(t, m.get('segmentacion')), ESQUEMA_CLUSTERING_LOTES)
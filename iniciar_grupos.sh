@@ -0,0 +1,21 @@
+#!/usr/bin/env bash
+# Perfil multi-pool: un gunicorn por grupo de rutas detrás de nginx.
+# Si cualquiera de los procesos termina, el script sale y el contenedor se reinicia.
+set -euo pipefail
+cd "$(dirname "$0")"
+
+PORT="${PORT:-10000}"
+TEMPORAL="${NGINX_TEMPORAL:-/tmp/nginx-grupos}"
+mkdir -p "$TEMPORAL"
+
+for grupo in interactivo lotes estatico; do
+    GRUPO="$grupo" gunicorn app:server &
+done
+
+python grupos_despliegue.py nginx --puerto "$PORT" --temporal "$TEMPORAL" > "$TEMPORAL/nginx.conf"
+nginx -c "$TEMPORAL/nginx.conf" -g 'daemon off;' &
+
+wait -n
+echo "❌ Un proceso del perfil de grupos terminó, deteniendo el resto"
+kill $(jobs -p) 2>/dev/null || true
+exit 1
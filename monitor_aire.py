@@ -0,0 +1,246 @@
+import argparse
+import io
+import json
+import os
+import tempfile
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from reglas_asociacion import NIVELES, VARIABLES, cargar_reglas
+
+# -----------------------
+# 🔹 Configuración
+# -----------------------
+BASE = os.path.dirname(os.path.abspath(__file__))
+ARTIFACTS_DIR = os.environ.get("ARTIFACTS_DIR", BASE)
+ESTADO_NOMBRE = "MonitorAire.json"
+
+# Columnas del dataset Air Quality (UCI) para cada variable de las reglas
+COLUMNAS_SENSORES = {
+    'co': 'CO(GT)',
+    'nox': 'NOx(GT)',
+    'no2': 'NO2(GT)',
+    'temp': 'T',
+    'humedad': 'RH',
+    'benceno': 'C6H6(GT)',
+}
+VALOR_FALTANTE = -200  # así marca el dataset las lecturas perdidas
+MAX_ALERTAS = 50
+
+
+class DiscretizadorIncremental:
+    """Bajo / medio / alto por terciles estimados en línea.
+
+    Los terciles se inicializan cuando hay `minimo_inicial` lecturas de cada
+    sensor (en modo tail suelen llegar de a una) y luego se ajustan con
+    aproximación estocástica (q += tasa * escala * (tau - P(x <= q))), así
+    que no hace falta guardar el histórico de lecturas. La escala tiene un
+    piso para que los cortes se muevan aunque el arranque sea casi constante.
+    """
+
+    TAUS = np.array([1 / 3, 2 / 3])
+
+    def __init__(self, tasa=0.05, minimo_inicial=200):
+        self.tasa = tasa
+        self.minimo_inicial = minimo_inicial
+        self.cortes = None  # (n_variables, 2)
+        self.escala = None
+        self.ultimo = np.ones(len(VARIABLES), dtype=np.int64)  # 'medio' hasta la primera lectura
+        self._inicial = []
+
+    def actualizar(self, X):
+        validos = ~np.isnan(X)
+        if self.cortes is None:
+            # Tope al búfer por si un sensor no entrega ninguna lectura válida
+            acumulado = np.vstack(self._inicial + [X])[-10 * self.minimo_inicial:]
+            self._inicial = [acumulado]
+            if (~np.isnan(acumulado)).sum(axis=0).min() < self.minimo_inicial:
+                return
+            self.cortes = np.nanquantile(acumulado, self.TAUS, axis=0).T
+            piso = 1e-2 * (np.abs(np.nanmean(acumulado, axis=0)) + 1)
+            self.escala = np.maximum(np.nanstd(acumulado, axis=0), piso)
+            self._inicial = []
+            return
+        n = validos.sum(axis=0)
+        con_datos = n > 0
+        # NaN <= q es False, así que las lecturas faltantes no cuentan
+        por_debajo = (X[:, :, None] <= self.cortes[None]).sum(axis=0) / np.maximum(n, 1)[:, None]
+        paso = self.tasa * self.escala[:, None] * (self.TAUS[None, :] - por_debajo)
+        self.cortes[con_datos] += paso[con_datos]
+        self.cortes.sort(axis=1)
+
+    def discretizar(self, X):
+        niveles = (X[:, :, None] > self.cortes[None]).sum(axis=2)
+        # Lecturas faltantes: se mantiene el último nivel conocido de ese sensor
+        faltantes = np.isnan(X)
+        if faltantes.any():
+            niveles = niveles.astype(float)
+            niveles[faltantes] = np.nan
+            niveles = pd.DataFrame(np.vstack([self.ultimo, niveles])).ffill().to_numpy()[1:]
+            niveles = niveles.astype(np.int64)
+        if len(niveles):
+            self.ultimo = niveles[-1].copy()
+        return niveles
+
+
+class EvaluadorReglas:
+    """Empareja lecturas discretizadas con la base de reglas.
+
+    Con 6 variables y 3 niveles solo hay 3^6 estados posibles: la tabla
+    estado -> reglas activas se calcula una vez y cada bloque de lecturas
+    se resuelve con un indexado. Solo se alerta cuando una regla pasa de
+    inactiva a activa.
+    """
+
+    def __init__(self, reglas=None):
+        self.reglas = list((cargar_reglas() if reglas is None else reglas).items())
+        self.pesos = len(NIVELES) ** np.arange(len(VARIABLES) - 1, -1, -1)
+        estados = np.indices((len(NIVELES),) * len(VARIABLES)).reshape(len(VARIABLES), -1).T
+        self.tabla = np.zeros((len(estados), len(self.reglas)), dtype=bool)
+        for j, ((antecedente, _), _) in enumerate(self.reglas):
+            variable, nivel = antecedente.rsplit('_', 1)
+            self.tabla[:, j] = estados[:, VARIABLES.index(variable)] == NIVELES.index(nivel)
+        self.previas = np.zeros(len(self.reglas), dtype=bool)
+
+    def procesar(self, niveles):
+        activas = self.tabla[niveles @ self.pesos]
+        anteriores = np.vstack([self.previas, activas[:-1]])
+        filas, reglas = np.nonzero(activas & ~anteriores)
+        if len(activas):
+            self.previas = activas[-1]
+        return filas, reglas
+
+
+class MonitorAire:
+    def __init__(self, ruta_estado=None, reglas=None):
+        self.ruta_estado = ruta_estado or os.path.join(ARTIFACTS_DIR, ESTADO_NOMBRE)
+        self.discretizador = DiscretizadorIncremental()
+        self.evaluador = EvaluadorReglas(reglas)
+        self.alertas = deque(maxlen=MAX_ALERTAS)
+        self.lecturas = 0
+        self.inicio = time.time()
+        self.condiciones = []
+
+    def procesar_bloque(self, df):
+        X = df[[COLUMNAS_SENSORES[v] for v in VARIABLES]].to_numpy(dtype=float)
+        X[X == VALOR_FALTANTE] = np.nan
+        # Las lecturas del calentamiento también cuentan, aunque aún no generen alertas
+        self.lecturas += len(df)
+        self.discretizador.actualizar(X)
+        if self.discretizador.cortes is None:
+            return []
+
+        niveles = self.discretizador.discretizar(X)
+        filas, reglas = self.evaluador.procesar(niveles)
+        marcas = _marcas_tiempo(df)
+        nuevas = []
+        for fila, j in zip(filas, reglas):
+            (antecedente, consecuente), info = self.evaluador.reglas[j]
+            nuevas.append({
+                'momento': marcas[fila],
+                'regla': f'{antecedente} → {consecuente}',
+                'confianza': info['confianza'],
+                'lift': info['lift'],
+                'descripcion': info['descripcion'],
+            })
+        self.alertas.extend(nuevas)
+        if len(niveles):
+            self.condiciones = [f'{v}_{NIVELES[n]}' for v, n in zip(VARIABLES, niveles[-1])]
+        return nuevas
+
+    def estado(self):
+        transcurrido = max(time.time() - self.inicio, 1e-9)
+        return {
+            'actualizado': time.time(),
+            'lecturas': self.lecturas,
+            'lecturas_por_segundo': self.lecturas / transcurrido,
+            'condiciones': self.condiciones,
+            'alertas': list(self.alertas)[::-1],
+        }
+
+    def guardar_estado(self):
+        # Escritura atómica: los workers del dashboard leen este archivo
+        directorio = os.path.dirname(self.ruta_estado)
+        os.makedirs(directorio, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.estado(), f, ensure_ascii=False)
+        os.replace(tmp, self.ruta_estado)
+
+
+def _marcas_tiempo(df):
+    if 'Date' in df.columns and 'Time' in df.columns:
+        return (df['Date'].astype(str) + ' ' + df['Time'].astype(str)).tolist()
+    return [time.strftime('%Y-%m-%d %H:%M:%S')] * len(df)
+
+
+def leer_estado(ruta=None):
+    ruta = ruta or os.path.join(ARTIFACTS_DIR, ESTADO_NOMBRE)
+    try:
+        with open(ruta, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# -----------------------
+# 🔹 Fuentes de lecturas
+# -----------------------
+def reproducir_csv(ruta, chunksize=1000, lecturas_por_segundo=None, sep=',', decimal='.'):
+    # Replay de un CSV ordenado en el tiempo; sin límite de velocidad por defecto
+    for bloque in pd.read_csv(ruta, chunksize=chunksize, sep=sep, decimal=decimal):
+        bloque = bloque.dropna(how='all')
+        yield bloque
+        if lecturas_por_segundo:
+            time.sleep(len(bloque) / lecturas_por_segundo)
+
+
+def seguir_archivo(ruta, sep=',', decimal='.', espera=0.5):
+    # Como `tail -f`: entrega en bloque todas las líneas nuevas que aparezcan
+    with open(ruta, encoding='utf-8') as f:
+        encabezado = f.readline()
+        f.seek(0, os.SEEK_END)
+        pendiente = ''
+        while True:
+            texto = f.read()
+            if not texto:
+                time.sleep(espera)
+                continue
+            texto = pendiente + texto
+            completas, _, pendiente = texto.rpartition('\n')
+            if completas:
+                yield pd.read_csv(io.StringIO(encabezado + completas + '\n'), sep=sep, decimal=decimal)
+
+
+def ejecutar(fuente, monitor=None, guardar_cada=1.0):
+    monitor = monitor or MonitorAire()
+    ultimo_guardado = 0.0
+    for bloque in fuente:
+        for alerta in monitor.procesar_bloque(bloque):
+            print(f"🚨 {alerta['momento']}: {alerta['regla']} ({alerta['confianza']:.0%})")
+        if time.time() - ultimo_guardado >= guardar_cada:
+            monitor.guardar_estado()
+            ultimo_guardado = time.time()
+    monitor.guardar_estado()
+    return monitor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monitor de reglas de calidad del aire")
+    parser.add_argument("modo", choices=["replay", "tail"])
+    parser.add_argument("archivo")
+    parser.add_argument("--chunksize", type=int, default=1000)
+    parser.add_argument("--velocidad", type=float, default=None, help="lecturas por segundo (replay)")
+    parser.add_argument("--sep", default=",")
+    parser.add_argument("--decimal", default=".")
+    args = parser.parse_args()
+
+    if args.modo == "replay":
+        fuente = reproducir_csv(args.archivo, args.chunksize, args.velocidad, args.sep, args.decimal)
+    else:
+        fuente = seguir_archivo(args.archivo, args.sep, args.decimal)
+    monitor = ejecutar(fuente)
+    print(f"✅ {monitor.lecturas} lecturas procesadas")
@@ -0,0 +1,192 @@
+import builtins
+import functools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# -----------------------
+# 🔹 Configuración
+# -----------------------
+# PERFIL_MEMORIA=1 activa el reporte de arranque, las deltas por callback y
+# /debug/memoria. Desactivado, todo esto es un no-op.
+ACTIVO = os.environ.get("PERFIL_MEMORIA") == "1"
+TRACEMALLOC_FRAMES = int(os.environ.get("PERFIL_MEMORIA_FRAMES", 1))
+RUTA_ENDPOINT = "/debug/memoria"
+
+
+def rss_mb():
+    # RSS actual del proceso; fuera de Linux, el pico (ru_maxrss)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss / 2 ** 20 if sys.platform == "darwin" else maxrss / 1024
+
+
+class PerfilMemoria:
+    """Dónde se va la memoria de cada worker.
+
+    - Arranque: RSS que suma cada import de primer nivel y cada artefacto
+      cargado (import anidados se cuentan en el import que los pidió).
+    - Callbacks: memoria retenida por llamada según tracemalloc y cambio de
+      RSS. tracemalloc es global al proceso, así que con varios hilos
+      atendiendo a la vez las deltas son aproximadas.
+    - Snapshot: asignaciones que más crecieron desde el final del arranque.
+
+    tracemalloc arranca al terminar el reporte de arranque para que su
+    propio consumo no se mezcle con el de los imports.
+    """
+
+    def __init__(self, activo=ACTIVO):
+        self.activo = activo
+        self.inicio = []  # (tipo, nombre, MB)
+        self.callbacks = {}
+        self.base = None
+        self._lock = threading.Lock()
+        self._import_original = None
+        self._profundidad = 0
+        self._rss_inicial = None
+
+    # ---- Arranque ----
+    def registrar_importaciones(self):
+        if not self.activo or self._import_original is not None:
+            return
+        self._rss_inicial = rss_mb()
+        self._import_original = builtins.__import__
+        original = self._import_original
+
+        def importar(nombre, globals=None, locals=None, fromlist=(), level=0):
+            if self._profundidad or level or nombre in sys.modules:
+                return original(nombre, globals, locals, fromlist, level)
+            self._profundidad += 1
+            antes = rss_mb()
+            try:
+                return original(nombre, globals, locals, fromlist, level)
+            finally:
+                self._profundidad -= 1
+                self.inicio.append(("import", nombre, rss_mb() - antes))
+
+        builtins.__import__ = importar
+
+    def terminar_importaciones(self):
+        if self._import_original is not None:
+            builtins.__import__ = self._import_original
+            self._import_original = None
+
+    @contextmanager
+    def medir(self, tipo, nombre):
+        if not self.activo:
+            yield
+            return
+        antes = rss_mb()
+        # Los imports que dispare (p. ej. al deserializar un pickle) cuentan en este artefacto
+        self._profundidad += 1
+        try:
+            yield
+        finally:
+            self._profundidad -= 1
+            self.inicio.append((tipo, nombre, rss_mb() - antes))
+
+    def reporte_inicio(self):
+        if not self.activo:
+            return
+        self.terminar_importaciones()
+        total = rss_mb()
+        previo = f", {self._rss_inicial:.1f} MB antes de los imports" if self._rss_inicial else ""
+        print(f"📏 RSS al terminar el arranque: {total:.1f} MB (pid {os.getpid()}{previo})")
+        for tipo, nombre, mb in sorted(self.inicio, key=lambda x: -x[2]):
+            if mb >= 0.1:
+                print(f"   {tipo:<9} {nombre:<40} {mb:8.1f} MB")
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        self.base = tracemalloc.take_snapshot()
+
+    # ---- Callbacks ----
+    def instrumentar_callbacks(self, app):
+        # Envuelve todos los callbacks de servidor registrados en la app
+        if not self.activo:
+            return
+        for entrada in app.callback_map.values():
+            if "callback" in entrada:
+                entrada["callback"] = self._medir_callback(entrada["callback"])
+
+    def _medir_callback(self, funcion):
+        nombre = getattr(funcion, "__name__", str(funcion))
+
+        @functools.wraps(funcion)
+        def medida(*args, **kwargs):
+            if not tracemalloc.is_tracing():
+                return funcion(*args, **kwargs)
+            traza_antes, rss_antes, inicio = tracemalloc.get_traced_memory()[0], rss_mb(), time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                delta_kb = (tracemalloc.get_traced_memory()[0] - traza_antes) / 1024
+                delta_rss = rss_mb() - rss_antes
+                with self._lock:
+                    s = self.callbacks.setdefault(nombre, {
+                        "llamadas": 0, "retenido_kb_total": 0.0, "retenido_kb_max": 0.0,
+                        "rss_mb_total": 0.0, "ms_total": 0.0})
+                    s["llamadas"] += 1
+                    s["retenido_kb_total"] += delta_kb
+                    s["retenido_kb_max"] = max(s["retenido_kb_max"], delta_kb)
+                    s["rss_mb_total"] += delta_rss
+                    s["ms_total"] += (time.perf_counter() - inicio) * 1000
+
+        return medida
+
+    # ---- Snapshot ----
+    def snapshot(self, top=20, agrupar="lineno"):
+        actual = tracemalloc.take_snapshot()
+        diferencias = actual.compare_to(self.base, agrupar) if self.base else actual.statistics(agrupar)
+        return [{
+            "ubicacion": str(d.traceback),
+            "kb": round(d.size / 1024, 1),
+            "kb_delta": round(getattr(d, "size_diff", d.size) / 1024, 1),
+            "bloques": d.count,
+        } for d in diferencias[:top]]
+
+    def estado(self, top=20, agrupar="lineno"):
+        actual, pico = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {
+            "pid": os.getpid(),
+            "rss_mb": round(rss_mb(), 1),
+            "traced_mb": round(actual / 2 ** 20, 1),
+            "traced_pico_mb": round(pico / 2 ** 20, 1),
+            "arranque": [{"tipo": t, "nombre": n, "mb": round(mb, 1)} for t, n, mb in self.inicio],
+            "callbacks": {nombre: dict({k: round(v, 1) for k, v in s.items()},
+                                       retenido_kb_promedio=round(s["retenido_kb_total"] / s["llamadas"], 1))
+                          for nombre, s in self.callbacks.items()},
+            "crecimiento": self.snapshot(top, agrupar) if tracemalloc.is_tracing() else [],
+        }
+
+    def registrar_endpoint(self, server):
+        """GET /debug/memoria?top=20&agrupar=lineno|filename|traceback&reiniciar=1 (por worker).
+
+        Con el perfil de grupos cada pool es un proceso distinto: se consulta
+        en el puerto de cada uno (interactivo 8001, lotes 8002, estatico 8003,
+        ver GRUPOS), no a través de nginx, que lo enviaría siempre al estático.
+        Dentro de un pool responde el worker que atienda la petición (el pid
+        va en la respuesta).
+        """
+        if not self.activo:
+            return
+        from flask import jsonify, request
+
+        @server.route(RUTA_ENDPOINT)
+        def debug_memoria():
+            agrupar = request.args.get("agrupar", "lineno")
+            if agrupar not in ("lineno", "filename", "traceback"):
+                return "❌ agrupar debe ser lineno, filename o traceback", 400
+            respuesta = jsonify(self.estado(int(request.args.get("top", 20)), agrupar))
+            if request.args.get("reiniciar") == "1" and tracemalloc.is_tracing():
+                # Siguiente snapshot: crecimiento desde ahora
+                self.base = tracemalloc.take_snapshot()
+            return respuesta
+
+
+perfil_memoria = PerfilMemoria()
@@ -0,0 +1,130 @@
+import itertools
+import json
+import os
+
+# -----------------------
+# 🔹 Base de reglas de asociación (calidad del aire)
+# -----------------------
+# Compartida por el callback de la pestaña de reglas y por el monitor en
+# tiempo real (monitor_aire.py). Si existe ReglasAsociacion.json (reglas
+# minadas) en ARTIFACTS_DIR, reemplaza a las reglas simuladas.
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+ARTIFACTS_DIR = os.environ.get("ARTIFACTS_DIR", BASE)
+REGLAS_NOMBRE = "ReglasAsociacion.json"
+
+VARIABLES = ['co', 'nox', 'no2', 'temp', 'humedad', 'benceno']
+NIVELES = ['bajo', 'medio', 'alto']
+
+# Simular base de reglas de asociación
+REGLAS = {
+    ('co_alto', 'nox_alto'): {'confianza': 0.85, 'lift': 2.3, 'descripcion': 'CO alto está fuertemente asociado con NOx alto'},
+    ('temp_alto', 'humedad_bajo'): {'confianza': 0.75, 'lift': 1.8, 'descripcion': 'Temperatura alta tiende a correlacionarse con baja humedad'},
+    ('nox_alto', 'no2_alto'): {'confianza': 0.88, 'lift': 2.5, 'descripcion': 'NOx alto predice fuertemente NO2 alto'},
+    ('benceno_alto', 'co_alto'): {'confianza': 0.70, 'lift': 1.9, 'descripcion': 'Benceno alto se asocia con CO alto'},
+    ('humedad_alto', 'temp_bajo'): {'confianza': 0.82, 'lift': 1.7, 'descripcion': 'Alta humedad se asocia con temperatura baja'}
+}
+
+# Si no hay reglas aplicables, se muestra una regla general
+REGLA_GENERAL = {'regla': 'co_medio → nox_medio', 'confianza': 0.65, 'lift': 1.4,
+                 'descripcion': 'Condiciones moderadas de CO tienden a asociarse con NOx moderado', 'aplicable': False}
+
+
+def condiciones(niveles):
+    # niveles: un nivel por variable, en el orden de VARIABLES
+    return [f'{variable}_{nivel}' for variable, nivel in zip(VARIABLES, niveles)]
+
+
+def reglas_aplicables(condiciones_actuales, reglas=None):
+    # Ordenadas de mayor a menor confianza (y lift en caso de empate)
+    reglas = REGLAS if reglas is None else reglas
+    aplicables = []
+    for (antecedente, consecuente), info in reglas.items():
+        if antecedente in condiciones_actuales:
+            aplicables.append({
+                'regla': f'{antecedente} → {consecuente}',
+                'confianza': info['confianza'],
+                'lift': info['lift'],
+                'descripcion': info['descripcion'],
+                'aplicable': True
+            })
+    aplicables.sort(key=lambda r: (r['confianza'], r['lift']), reverse=True)
+    return aplicables
+
+
+def cargar_reglas(ruta=None):
+    # Formato: [{"antecedente", "consecuente", "confianza", "lift", "descripcion"}, ...]
+    ruta = ruta or os.path.join(ARTIFACTS_DIR, REGLAS_NOMBRE)
+    if not os.path.exists(ruta):
+        return REGLAS
+    try:
+        with open(ruta, encoding='utf-8') as f:
+            return {
+                (r['antecedente'], r['consecuente']): {
+                    'confianza': float(r['confianza']), 'lift': float(r['lift']),
+                    'descripcion': r.get('descripcion', '')
+                }
+                for r in json.load(f)
+            }
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        # Un archivo mal formado no debe impedir que arranquen los workers
+        print(f"❌ Error leyendo {ruta}, se usan las reglas por defecto", e)
+        return REGLAS
+
+
+class TablaReglas:
+    """Respuesta precalculada para cada combinación de niveles.
+
+    Con 6 variables y 3 niveles hay 3^6 = 729 combinaciones posibles, así
+    que al cargar las reglas se evalúan todas y se guarda la respuesta ya
+    serializada a JSON (no los componentes de Dash, que ocupan mucho más);
+    el callback solo hace una búsqueda en un diccionario. La tabla se
+    regenera cuando cambia el archivo de reglas.
+    """
+
+    def __init__(self, renderizar, ruta=None):
+        self.renderizar = renderizar
+        self.ruta = ruta or os.path.join(ARTIFACTS_DIR, REGLAS_NOMBRE)
+        self.reglas = None
+        self.coincidencias = {}
+        self.tabla = {}
+        self._mtime = None
+        self.actualizar()
+
+    def _mtime_actual(self):
+        try:
+            return os.path.getmtime(self.ruta)
+        except OSError:
+            return None
+
+    def actualizar(self):
+        mtime = self._mtime_actual()
+        if self.reglas is not None and mtime == self._mtime:
+            return False
+        self.reglas = cargar_reglas(self.ruta)
+        self._mtime = mtime
+        coincidencias, tabla = {}, {}
+        for niveles in itertools.product(NIVELES, repeat=len(VARIABLES)):
+            conds = condiciones(niveles)
+            coincidencias[niveles] = reglas_aplicables(conds, self.reglas)
+            tabla[niveles] = _serializar(self.renderizar(conds, coincidencias[niveles]))
+        self.coincidencias = coincidencias
+        self.tabla = tabla
+        print(f"✅ Tabla de reglas precalculada: {len(tabla)} combinaciones, {len(self.reglas)} reglas")
+        return True
+
+    def obtener(self, niveles):
+        self.actualizar()
+        niveles = tuple(niveles)
+        if niveles in self.tabla:
+            # Dash acepta el componente en su forma JSON ({'type', 'namespace', 'props'})
+            return json.loads(self.tabla[niveles])
+        # Combinación fuera de la tabla (p. ej. un dropdown vacío): se calcula al vuelo
+        conds = condiciones(niveles)
+        return self.renderizar(conds, reglas_aplicables(conds, self.reglas))
+
+
+def _serializar(componente):
+    # Mismo JSON que envía Dash; plotly solo se importa si se usa la tabla
+    from plotly.io.json import to_json_plotly
+    return to_json_plotly(componente)
@@ -0,0 +1,181 @@
+import json
+import os
+import sys
+import tempfile
+import traceback
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# -----------------------
+# 🔹 Configuración
+# -----------------------
+BASE = os.path.dirname(os.path.abspath(__file__))
+ARTIFACTS_DIR = os.environ.get("ARTIFACTS_DIR", BASE)
+CHECKPOINT_NOMBRE = "SegmentacionOnline.pkl"
+# Exportación sin sklearn del mismo checkpoint (la recarga INFERENCIA=numpy, ver inferencia_numpy.py)
+EXPORTACION_NOMBRE = "SegmentacionOnline.json"
+
+COLUMNAS = ['Gasto', 'Transacciones', 'Productos']
+SEGMENTOS = ['Básico', 'Regular', 'Premium']
+
+
+class SegmentadorOnline:
+    """Segmentación de clientes que se actualiza por bloques (partial_fit).
+
+    El scaler acumula media y varianza de todos los bloques vistos y los
+    centroides se actualizan al estilo MiniBatchKMeans, así que no hace
+    falta reentrenar sobre todo el histórico. Como la escala cambia con
+    cada bloque, los centroides se reproyectan a la escala nueva antes de
+    actualizarlos.
+    """
+
+    def __init__(self, n_segmentos=3, checkpoint_cada=10, directorio=None, random_state=42):
+        # sklearn solo se importa al entrenar; la app puede servir sin él (INFERENCIA=numpy)
+        from sklearn.cluster import MiniBatchKMeans
+        from sklearn.preprocessing import StandardScaler
+
+        self.n_segmentos = n_segmentos
+        self.checkpoint_cada = checkpoint_cada
+        self.directorio = directorio or ARTIFACTS_DIR
+        self.scaler = StandardScaler()
+        self.kmeans = MiniBatchKMeans(n_clusters=n_segmentos, random_state=random_state, n_init=3)
+        self.bloques_vistos = 0
+
+    @property
+    def entrenado(self):
+        return hasattr(self.kmeans, 'cluster_centers_')
+
+    @property
+    def muestras_vistas(self):
+        return int(getattr(self.scaler, 'n_samples_seen_', 0))
+
+    def _a_matriz(self, datos):
+        if isinstance(datos, pd.DataFrame):
+            datos = datos[COLUMNAS].to_numpy(dtype=float)
+        X = np.asarray(datos, dtype=float).reshape(-1, len(COLUMNAS))
+        return X[~np.isnan(X).any(axis=1)]
+
+    def partial_fit(self, datos):
+        X = self._a_matriz(datos)
+        # MiniBatchKMeans necesita al menos n_segmentos filas en el primer bloque
+        if len(X) == 0 or (not self.entrenado and len(X) < self.n_segmentos):
+            return self
+
+        if self.entrenado:
+            # Centroides a unidades originales con la escala vieja y de vuelta con la nueva
+            centros = self.scaler.inverse_transform(self.kmeans.cluster_centers_)
+            self.scaler.partial_fit(X)
+            self.kmeans.cluster_centers_[:] = self.scaler.transform(centros)
+        else:
+            self.scaler.partial_fit(X)
+        self.kmeans.partial_fit(self.scaler.transform(X))
+        self.bloques_vistos += 1
+
+        if self.checkpoint_cada and self.bloques_vistos % self.checkpoint_cada == 0:
+            self.guardar()
+        return self
+
+    def centroides(self):
+        # Centroides en unidades originales (Gasto, Transacciones, Productos)
+        return self.scaler.inverse_transform(self.kmeans.cluster_centers_)
+
+    def nombres_segmentos(self):
+        # Se ordenan los centroides por gasto: menor -> Básico, mayor -> Premium
+        orden = np.argsort(self.centroides()[:, 0])
+        nombres = {}
+        for posicion, cluster in enumerate(orden):
+            indice = round(posicion * (len(SEGMENTOS) - 1) / max(len(orden) - 1, 1))
+            nombres[int(cluster)] = SEGMENTOS[indice]
+        return nombres
+
+    def predecir(self, datos):
+        X = np.asarray(
+            datos[COLUMNAS].to_numpy(dtype=float) if isinstance(datos, pd.DataFrame) else datos,
+            dtype=float,
+        ).reshape(-1, len(COLUMNAS))
+        clusters = self.kmeans.predict(self.scaler.transform(X))
+        nombres = self.nombres_segmentos()
+        return [nombres[int(c)] for c in clusters]
+
+    def exportar_numpy(self):
+        # Parámetros para SegmentacionEstatica; JSON conserva los float64 exactos
+        return {
+            "mean": self.scaler.mean_.tolist(),
+            "scale": self.scaler.scale_.tolist(),
+            "centros": self.kmeans.cluster_centers_.tolist(),
+            "nombres": {str(k): v for k, v in self.nombres_segmentos().items()},
+        }
+
+    def guardar(self, ruta=None):
+        ruta = ruta or os.path.join(self.directorio, CHECKPOINT_NOMBRE)
+        directorio = os.path.dirname(ruta)
+        os.makedirs(directorio, exist_ok=True)
+        # Escritura atómica para que los workers nunca lean un pickle a medias
+        fd, tmp = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+        os.close(fd)
+        joblib.dump(self, tmp)
+        os.replace(tmp, ruta)
+        if self.entrenado:
+            fd, tmp = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.exportar_numpy(), f, ensure_ascii=False)
+            os.replace(tmp, os.path.join(directorio, EXPORTACION_NOMBRE))
+        print(f"💾 Checkpoint de segmentación guardado ({self.muestras_vistas} muestras): {ruta}")
+        return ruta
+
+
+class SegmentacionRecargable:
+    """Envoltorio para la app: recarga el checkpoint cuando cambia en disco."""
+
+    def __init__(self, ruta=None):
+        self.ruta = ruta or os.path.join(ARTIFACTS_DIR, CHECKPOINT_NOMBRE)
+        self.modelo = None
+        self._mtime = None
+
+    def actual(self):
+        try:
+            mtime = os.path.getmtime(self.ruta)
+        except OSError:
+            return self.modelo
+        if mtime != self._mtime:
+            try:
+                self.modelo = joblib.load(self.ruta)
+                self._mtime = mtime
+                print(f"✅ Segmentación online cargada ({self.modelo.muestras_vistas} muestras)")
+            except Exception as e:
+                print("❌ Error cargando segmentación online", e)
+                traceback.print_exc()
+        return self.modelo if self.modelo is not None and self.modelo.entrenado else None
+
+
+def entrenar_desde_csv(ruta_csv, chunksize=5000, checkpoint_cada=10, directorio=None):
+    ruta_checkpoint = os.path.join(directorio or ARTIFACTS_DIR, CHECKPOINT_NOMBRE)
+    if os.path.exists(ruta_checkpoint):
+        modelo = joblib.load(ruta_checkpoint)
+        modelo.checkpoint_cada = checkpoint_cada
+        print(f"🔄 Continuando desde checkpoint ({modelo.muestras_vistas} muestras)")
+    else:
+        modelo = SegmentadorOnline(checkpoint_cada=checkpoint_cada, directorio=directorio)
+
+    for bloque in pd.read_csv(ruta_csv, usecols=COLUMNAS, chunksize=chunksize):
+        modelo.partial_fit(bloque)
+
+    if modelo.entrenado:
+        modelo.guardar(ruta_checkpoint)
+    return modelo
+
+
+if __name__ == "__main__":
+    # Uso: python segmentacion_online.py clientes.csv [chunksize]
+    if len(sys.argv) < 2:
+        print("Uso: python segmentacion_online.py <clientes.csv> [chunksize]")
+        sys.exit(1)
+    # Importar desde el módulo para que el pickle no quede ligado a __main__
+    from segmentacion_online import entrenar_desde_csv as _entrenar
+    chunksize = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    modelo = _entrenar(sys.argv[1], chunksize=chunksize)
+    if modelo.entrenado:
+        for cluster, nombre in sorted(modelo.nombres_segmentos().items()):
+            print(f"📊 {nombre}: {np.round(modelo.centroides()[cluster], 2).tolist()}")
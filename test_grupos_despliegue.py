@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+from flask import Flask
+
+import grupos_despliegue
+from grupos_despliegue import GRUPOS, registrar_limites
+
+# El cupo de cada grupo solo sirve si gunicorn tiene más hilos que cupo:
+# con todos los hilos ocupados la petición extra esperaría en la cola en vez
+# de recibir 503.
+
+
+@pytest.mark.parametrize("grupo", list(GRUPOS))
+def test_hilos_por_encima_del_cupo(grupo):
+    assert GRUPOS[grupo]['threads'] > GRUPOS[grupo]['max_concurrentes']
+
+
+def _servidor(liberar, dentro):
+    server = Flask(__name__)
+    registrar_limites(server)
+
+    @server.route("/api/lento", methods=["POST"])
+    def lento():
+        dentro.release()
+        liberar.wait(10)
+        return "ok"
+
+    return server
+
+
+def test_503_al_superar_el_cupo(monkeypatch):
+    monkeypatch.setattr(grupos_despliegue, "GRUPO", "lotes")
+    cupo = GRUPOS['lotes']['max_concurrentes']
+    liberar, dentro = threading.Event(), threading.Semaphore(0)
+    server = _servidor(liberar, dentro)
+
+    estados = []
+    hilos = [threading.Thread(target=lambda: estados.append(server.test_client().post("/api/lento").status_code))
+             for _ in range(cupo)]
+    for h in hilos:
+        h.start()
+    for _ in range(cupo):
+        assert dentro.acquire(timeout=10)
+
+    # Con el cupo ocupado, la siguiente se rechaza sin esperar
+    saturada = server.test_client().post("/api/lento")
+    assert saturada.status_code == 503
+    assert saturada.headers["Retry-After"] == "1"
+
+    liberar.set()
+    for h in hilos:
+        h.join()
+    assert estados == [200] * cupo
+
+    # Los cupos se devuelven al terminar cada petición
+    assert server.test_client().post("/api/lento").status_code == 200
+
+
+@pytest.mark.parametrize("grupo", list(GRUPOS))
+def test_debug_en_todos_los_pools(monkeypatch, grupo):
+    monkeypatch.setattr(grupos_despliegue, "GRUPO", grupo)
+    server = Flask(__name__)
+    registrar_limites(server)
+    server.add_url_rule("/debug/memoria", "debug", lambda: "ok")
+    server.add_url_rule("/api/clustering", "lote", lambda: "ok", methods=["POST"])
+
+    assert server.test_client().get("/debug/memoria").status_code == 200
+    assert server.test_client().post("/api/clustering").status_code == (200 if grupo == 'lotes' else 421)
@@ -0,0 +1,53 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+from exportar_modelos import COLUMNAS_CLASIFICACION, datos_prueba, exportar_estimador, verificar_paridad
+from inferencia_numpy import PAQUETE_NOMBRE, cargar_paquete
+
+# Paridad bit a bit del runtime NumPy con modelos sintéticos: el repo no trae
+# ClasificacionDe.pkl, así que la verificación de exportar_modelos.py solo
+# cubriría los modelos lineales y los encoders.
+
+
+def _ida_y_vuelta(directorio, originales):
+    metadatos, arrays = {}, {}
+    for archivo, modelo in originales.items():
+        metadatos[archivo] = exportar_estimador(archivo, modelo, arrays)
+    np.savez_compressed(directorio / (PAQUETE_NOMBRE + ".npz"), **arrays)
+    with open(directorio / (PAQUETE_NOMBRE + ".json"), "w", encoding="utf-8") as f:
+        json.dump(metadatos, f)
+    return cargar_paquete(str(directorio))
+
+
+def _datos_clasificacion(n_clases, n=600, semilla=0):
+    # Mismos rangos enteros que usa verificar_paridad para generar entradas
+    rng = np.random.default_rng(semilla)
+    X = pd.DataFrame({c: rng.integers(0, 100000 if c == 'fnlwgt' else 100, n) for c in COLUMNAS_CLASIFICACION})
+    puntaje = X['age'] + X['hours-per-week'] - X['education'] / 2 + rng.normal(0, 10, n)
+    y = np.digitize(puntaje, np.quantile(puntaje, np.linspace(0, 1, n_clases + 1)[1:-1]))
+    return X, y
+
+
+@pytest.mark.parametrize("n_clases", [2, 3])
+@pytest.mark.parametrize("modelo", [
+    LogisticRegression(max_iter=2000),
+    LogisticRegression(solver="liblinear"),
+    DecisionTreeClassifier(max_depth=8, random_state=0),
+    RandomForestClassifier(n_estimators=15, max_depth=6, random_state=0),
+], ids=["logistica", "logistica_liblinear", "arbol", "bosque"])
+def test_paridad_clasificadores(tmp_path, modelo, n_clases):
+    X, y = _datos_clasificacion(n_clases)
+    originales = {"ClasificacionDe.pkl": modelo.fit(X, y)}
+    assert verificar_paridad(originales, _ida_y_vuelta(tmp_path, originales)) == []
+
+
+def test_paridad_regresion(tmp_path):
+    paises, _, rng = datos_prueba(n=300, semilla=1)
+    originales = {"RegresionSa.pkl": LinearRegression().fit(paises, rng.normal(5, 1, len(paises)))}
+    assert verificar_paridad(originales, _ida_y_vuelta(tmp_path, originales)) == []
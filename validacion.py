@@ -0,0 +1,191 @@
+import json
+
+import numpy as np
+
+# -----------------------
+# 🔹 Esquemas de entrada de cada modelo
+# -----------------------
+# numero: rango [min, max] opcional y valor por defecto; categoria: valores
+# permitidos. Los rangos son los mismos que usan los sliders e inputs del
+# layout; sin min/max solo se exige que el valor sea un número.
+
+ESQUEMA_REGRESION = {
+    'GDP per capita': {'tipo': 'numero', 'min': 0.1, 'max': 2.0, 'defecto': 1.0, 'etiqueta': 'PIB per cápita'},
+    'Social support': {'tipo': 'numero', 'min': 0.0, 'max': 1.0, 'defecto': 0.7, 'etiqueta': 'Apoyo Social'},
+    'Healthy life expectancy': {'tipo': 'numero', 'min': 0.0, 'max': 1.0, 'defecto': 0.6, 'etiqueta': 'Expectativa de Vida'},
+    'Freedom to make life choices': {'tipo': 'numero', 'min': 0.0, 'max': 0.8, 'defecto': 0.4, 'etiqueta': 'Libertad'},
+    'Generosity': {'tipo': 'numero', 'min': 0.0, 'max': 0.5, 'defecto': 0.2, 'etiqueta': 'Generosidad'},
+    'Perceptions of corruption': {'tipo': 'numero', 'min': 0.0, 'max': 1.0, 'defecto': 0.5, 'etiqueta': 'Percepción Corrupción'},
+}
+
+ESQUEMA_CLUSTERING = {
+    'Gasto': {'tipo': 'numero', 'min': 1, 'max': 5000, 'defecto': 500, 'etiqueta': 'Gasto Total'},
+    'Transacciones': {'tipo': 'numero', 'min': 1, 'max': 100, 'defecto': 10, 'etiqueta': 'Transacciones'},
+    'Productos': {'tipo': 'numero', 'min': 1, 'max': 200, 'defecto': 20, 'etiqueta': 'Productos'},
+}
+
+# Clientes múltiples y /api/clustering: sus inputs no tienen rango, solo se exige un número
+ESQUEMA_CLUSTERING_LOTES = {
+    nombre: {k: v for k, v in campo.items() if k not in ('min', 'max')}
+    for nombre, campo in ESQUEMA_CLUSTERING.items()
+}
+
+ESQUEMA_CLASIFICACION = {
+    'age': {'tipo': 'numero', 'min': 17, 'max': 90, 'defecto': 39, 'etiqueta': 'Edad'},
+    'workclass': {'tipo': 'categoria', 'defecto': 'Private', 'etiqueta': 'Clase de Trabajo'},
+    'education': {'tipo': 'categoria', 'defecto': 'Bachelors', 'etiqueta': 'Educación'},
+    'marital-status': {'tipo': 'categoria', 'defecto': 'Never-married', 'etiqueta': 'Estado Civil'},
+    'occupation': {'tipo': 'categoria', 'defecto': 'Exec-managerial', 'etiqueta': 'Ocupación'},
+    'sex': {'tipo': 'categoria', 'valores': ['Male', 'Female'], 'defecto': 'Male', 'etiqueta': 'Sexo'},
+    'hours-per-week': {'tipo': 'numero', 'min': 1, 'max': 99, 'defecto': 40, 'etiqueta': 'Horas por Semana'},
+    'native-country': {'tipo': 'categoria', 'defecto': 'United-States', 'etiqueta': 'País de Origen'},
+}
+
+MODOS = ('rechazar', 'descartar', 'reparar')
+
+
+# -----------------------
+# 🔹 Validación vectorizada
+# -----------------------
+def _mascaras(esquema, columnas, categorias=None):
+    # Por campo: (valores normalizados, faltantes, inválidos)
+    resultado = {}
+    for nombre, campo in esquema.items():
+        if nombre not in columnas:
+            continue
+        valores = columnas[nombre]
+        if campo['tipo'] == 'numero':
+            numeros = _a_float(valores)
+            faltantes = np.isnan(numeros)
+            malas = faltantes.copy()
+            if 'min' in campo:
+                malas |= ~faltantes & (numeros < campo['min'])
+            if 'max' in campo:
+                malas |= ~faltantes & (numeros > campo['max'])
+            resultado[nombre] = (numeros, faltantes, malas)
+        else:
+            permitidos = campo.get('valores') or (categorias or {}).get(nombre)
+            texto = np.asarray(valores, dtype=object)
+            faltantes = np.equal(texto, None)
+            malas = faltantes.copy()
+            if permitidos is not None:
+                malas |= ~np.isin(texto.astype(str), np.asarray(permitidos, dtype=str))
+            resultado[nombre] = (texto, faltantes, malas)
+    return resultado
+
+
+def validar_arrays(esquema, columnas, modo='rechazar', categorias=None):
+    """Valida columnas completas de una vez, sin excepciones por fila.
+
+    columnas: {nombre: array}. categorias: {nombre: valores permitidos}
+    para las categóricas sin 'valores' en el esquema (p. ej. las clases del
+    LabelEncoder). Devuelve (columnas, validas, errores) donde `validas` es
+    la máscara de filas correctas en la entrada y `errores` cuenta las filas
+    inválidas por campo.
+
+    - rechazar / descartar: las columnas se devuelven solo con filas válidas.
+    - reparar: faltantes -> defecto, números fuera de rango -> recortados al
+      rango, categorías desconocidas -> defecto. Todas las filas quedan.
+    """
+    if modo not in MODOS:
+        raise ValueError(f"Modo de validación desconocido: {modo}")
+    n = len(next(iter(columnas.values()))) if columnas else 0
+    validas = np.ones(n, dtype=bool)
+    errores, salida = {}, {}
+
+    for nombre, (valores, faltantes, malas) in _mascaras(esquema, columnas, categorias).items():
+        campo = esquema[nombre]
+        if modo == 'reparar' and malas.any():
+            if campo['tipo'] == 'numero':
+                valores = np.where(faltantes, campo['defecto'], np.clip(valores, campo.get('min', -np.inf), campo.get('max', np.inf)))
+            else:
+                valores = np.where(malas, campo['defecto'], valores)
+        salida[nombre] = valores
+        if malas.any():
+            errores[nombre] = int(malas.sum())
+            validas &= ~malas
+
+    if modo != 'reparar' and not validas.all():
+        salida = {nombre: valores[validas] for nombre, valores in salida.items()}
+    return salida, validas, errores
+
+
+def _a_float(valores):
+    try:
+        return np.asarray(valores, dtype=np.float64)
+    except (TypeError, ValueError):
+        # None o texto: se convierten uno a uno y lo inválido queda como NaN
+        return np.array([_numero(v) for v in valores], dtype=np.float64)
+
+
+def _numero(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def validar_filas(esquema, filas, nombres=None):
+    """Valida una o varias filas del formulario (listas en el orden del esquema).
+
+    Devuelve None si todo es válido o un mensaje con los campos a corregir.
+    """
+    columnas = {c: np.array(v, dtype=object) for c, v in zip(esquema, zip(*filas))}
+    mascaras = _mascaras(esquema, columnas)
+    problemas = []
+    for i in range(len(filas)):
+        campos = [esquema[c]['etiqueta'] + _rango(esquema[c]) for c, (_, _, malas) in mascaras.items() if malas[i]]
+        if campos:
+            problemas.append((f"{nombres[i]}: " if nombres else "") + ", ".join(campos))
+    return "⚠️ Entrada inválida — " + "; ".join(problemas) if problemas else None
+
+
+def _rango(campo):
+    return f" ({campo['min']}–{campo['max']})" if 'min' in campo and 'max' in campo else ""
+
+
+# -----------------------
+# 🔹 Validación en el navegador
+# -----------------------
+def funcion_cliente(esquema, campos_por_fila, nombres_filas=None, con_nombre=False):
+    """Genera una función JS para app.clientside_callback con el mismo esquema.
+
+    Recibe los valores de los inputs en el orden de `campos_por_fila`
+    (repetido por fila) y devuelve el mensaje de error o "" si todo es
+    válido, sin ir al servidor. Con `con_nombre`, cada fila empieza con el
+    valor del input de nombre (como en los callbacks de servidor) y ese es
+    el nombre que aparece en el mensaje; `nombres_filas` queda de respaldo
+    si está vacío.
+    """
+    numericos = {c: esquema[c] for c in campos_por_fila if esquema[c]['tipo'] == 'numero'}
+    return """
+function() {
+    const esquema = %s;
+    const campos = %s;
+    const nombres = %s;
+    const conNombre = %s;
+    const paso = campos.length + (conNombre ? 1 : 0);
+    const valores = Array.from(arguments);
+    const problemas = [];
+    for (let f = 0; f * paso < valores.length; f++) {
+        const fila = valores.slice(f * paso, (f + 1) * paso);
+        const nombre = (conNombre ? fila.shift() : null) || nombres[f];
+        const malos = [];
+        campos.forEach(function(campo, j) {
+            const regla = esquema[campo];
+            if (!regla) { return; }
+            const v = fila[j];
+            const conRango = regla.min !== undefined && regla.max !== undefined;
+            if (v === null || v === undefined || v === '' || isNaN(v) ||
+                    (regla.min !== undefined && v < regla.min) || (regla.max !== undefined && v > regla.max)) {
+                malos.push(regla.etiqueta + (conRango ? ' (' + regla.min + '–' + regla.max + ')' : ''));
+            }
+        });
+        if (malos.length) {
+            problemas.push((nombre ? nombre + ': ' : '') + malos.join(', '));
+        }
+    }
+    return problemas.length ? '⚠️ Entrada inválida — ' + problemas.join('; ') : '';
+}
+""" % (json.dumps(numericos, ensure_ascii=False), json.dumps(list(campos_por_fila)),
+       json.dumps(nombres_filas or [], ensure_ascii=False), json.dumps(con_nombre))